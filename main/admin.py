@@ -1,5 +1,10 @@
+from itertools import zip_longest
+
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
+from django.db.models import Count, Q, prefetch_related_objects
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import (
@@ -9,12 +14,29 @@ from .models import (
     Conference, DissertationBank, ArticleBank, ResearcherRegulation,
     Module, Question, Answer, UserCourseProgress,
     UserModuleProgress, UserTestResult, Certificate, TestSet,
-    AssessmentTest, AssessmentTestResult
+    AssessmentTest, AssessmentTestResult, TestAttempt, CertificateJob, University
 )
+from .answer_keys import invalidate_answer_key
+from .course_progress import recount_course_progress
+from .search import search_text_condition
+
+
+class NormalizedSearchMixin:
+    """
+    Admin qidiruvi search_fields bo'yicha icontains o'rniga normallashtirilgan
+    search_text ustuni (pg_trgm indeksi) orqali bajariladi: "oʻzbek", "o'zbek"
+    va "ўзбек" bir xil topiladi. search_fields qidiruv maydonini ko'rsatish
+    uchun qoladi - ularning qiymatlari search_text ga yig'iladi (main/search.py).
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search_text_condition(search_term)), False
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(NormalizedSearchMixin, BaseUserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'phone_number', 'residence_region', 'university', 'academic_degree', 'status', 'assessment_status')
     list_filter = ('status', 'academic_degree', 'assessment_status', 'is_staff', 'is_superuser')
     search_fields = ('username', 'email', 'first_name', 'last_name', 'university')
@@ -58,11 +80,16 @@ class TestSetAdmin(admin.ModelAdmin):
     readonly_fields = ('question_count', 'created_at', 'updated_at')
     fields = ('name', 'description', 'question_count', 'created_at', 'updated_at')
     
+    def get_queryset(self, request):
+        # Savollar soni har bir qator uchun alohida COUNT emas, bitta so'rovda hisoblanadi
+        return super().get_queryset(request).annotate(num_questions=Count('questions'))
+    
     def question_count(self, obj):
         if obj.pk:
-            return obj.questions.count()
+            return obj.num_questions
         return 0
     question_count.short_description = 'Savollar soni'
+    question_count.admin_order_field = 'num_questions'
 
 
 @admin.register(Course)
@@ -70,6 +97,7 @@ class CourseAdmin(admin.ModelAdmin):
     from main.forms import CourseAdminForm
     form = CourseAdminForm
     list_display = ('name', 'module_count', 'test_set', 'passing_score', 'is_active', 'created_at')
+    list_select_related = ('test_set',)
     search_fields = ('name', 'short_description')
     list_filter = ('is_active', 'test_set', 'created_at')
     readonly_fields = ('created_at', 'updated_at')
@@ -118,7 +146,7 @@ class BuxduWinnerDatabaseAdmin(admin.ModelAdmin):
 
 
 @admin.register(Olympiad)
-class OlympiadAdmin(admin.ModelAdmin):
+class OlympiadAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     from main.forms import OlympiadAdminForm
     form = OlympiadAdminForm
     list_display = ('name', 'subject', 'country', 'type', 'date', 'created_at')
@@ -144,10 +172,26 @@ class BuxduOlympiadImageInline(admin.TabularInline):
     verbose_name_plural = 'Olimpiada rasmlari'
 
 
+class OlympiadStatusFilter(admin.SimpleListFilter):
+    """Kutilayotgan/tugagan olimpiadalar - date bo'yicha oraliq so'rovi"""
+    title = 'Status'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return [('upcoming', 'Kutilmoqda'), ('finished', 'Tugagan')]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'upcoming':
+            return queryset.upcoming()
+        if self.value() == 'finished':
+            return queryset.finished()
+        return queryset
+
+
 @admin.register(BuxduOlympiad)
 class BuxduOlympiadAdmin(admin.ModelAdmin):
     list_display = ('subject', 'date', 'status_display', 'image_count', 'created_at')
-    list_filter = ('date', 'subject')
+    list_filter = (OlympiadStatusFilter, 'date', 'subject')
     search_fields = ('subject', 'description')
     date_hierarchy = 'date'
     readonly_fields = ('status_display', 'image_count')
@@ -161,18 +205,23 @@ class BuxduOlympiadAdmin(admin.ModelAdmin):
             return mark_safe('<span style="color: #dc2626; font-weight: bold;">🔴 Tugagan</span>')
         return mark_safe('<span style="color: #16a34a; font-weight: bold;">🟢 Kutilmoqda</span>')
     status_display.short_description = 'Status'
+    status_display.admin_order_field = 'date_status'
+    
+    def get_queryset(self, request):
+        # Status va rasmlar soni SQL da hisoblanadi - ro'yxatni ularga ko'ra saralash mumkin
+        return super().get_queryset(request).with_status().annotate(num_images=Count('images'))
     
     def image_count(self, obj):
         """Yuklangan rasmlar soni"""
         if obj.pk:
-            count = obj.images.count()
-            return f"{count} ta rasm"
+            return f"{obj.num_images} ta rasm"
         return "0 ta rasm"
     image_count.short_description = 'Rasmlar'
+    image_count.admin_order_field = 'num_images'
 
 
 @admin.register(OakDatabase)
-class OakDatabaseAdmin(admin.ModelAdmin):
+class OakDatabaseAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     list_display = ('journal_name', 'type', 'created_at')
     list_filter = ('type',)
     search_fields = ('journal_name', 'fields')
@@ -180,7 +229,7 @@ class OakDatabaseAdmin(admin.ModelAdmin):
 
 
 @admin.register(Conference)
-class ConferenceAdmin(admin.ModelAdmin):
+class ConferenceAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     list_display = ('name', 'type', 'created_at')
     list_filter = ('type',)
     search_fields = ('name',)
@@ -188,7 +237,7 @@ class ConferenceAdmin(admin.ModelAdmin):
 
 
 @admin.register(DissertationBank)
-class DissertationBankAdmin(admin.ModelAdmin):
+class DissertationBankAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     list_display = ('database_type', 'direction', 'created_at')
     list_filter = ('database_type',)
     search_fields = ('database_type', 'direction')
@@ -196,14 +245,14 @@ class DissertationBankAdmin(admin.ModelAdmin):
 
 
 @admin.register(ArticleBank)
-class ArticleBankAdmin(admin.ModelAdmin):
+class ArticleBankAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     list_display = ('name', 'created_at')
     search_fields = ('name', 'short_guide')
     fields = ('name', 'short_guide', 'database_link')
 
 
 @admin.register(ResearcherRegulation)
-class ResearcherRegulationAdmin(admin.ModelAdmin):
+class ResearcherRegulationAdmin(NormalizedSearchMixin, admin.ModelAdmin):
     list_display = ('regulation_name', 'created_at')
     search_fields = ('regulation_name',)
     fields = ('regulation_name', 'file')
@@ -216,6 +265,7 @@ class QuestionAdmin(admin.ModelAdmin):
     form = QuestionWithAnswersForm
     
     list_display = ('test_set', 'number', 'text_preview', 'answer_count')
+    list_select_related = ('test_set',)
     list_filter = ('test_set',)
     search_fields = ('text',)
     ordering = ('test_set', 'number')
@@ -226,16 +276,27 @@ class QuestionAdmin(admin.ModelAdmin):
         return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
     text_preview.short_description = 'Savol matni'
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(num_answers=Count('answers'))
+    
+    def get_object(self, request, object_id, from_field=None):
+        # Forma va answer_preview javoblarni bitta so'rovdan o'qiydi
+        obj = super().get_object(request, object_id, from_field)
+        if obj is not None:
+            prefetch_related_objects([obj], 'answers')
+        return obj
+    
     def answer_count(self, obj):
         if obj.pk:
-            return obj.answers.count()
+            return obj.num_answers
         return 0
     answer_count.short_description = 'Javoblar soni'
+    answer_count.admin_order_field = 'num_answers'
     
     def answer_preview(self, obj):
         if not obj.pk:
             return '-'
-        answers = obj.answers.all()
+        answers = sorted(obj.answers.all(), key=lambda ans: ans.pk)
         html = '<ul style="list-style: none; padding: 0;">'
         for ans in answers:
             icon = '✓' if ans.is_correct else '○'
@@ -247,79 +308,147 @@ class QuestionAdmin(admin.ModelAdmin):
     answer_preview.short_description = 'Javoblar ko\'rinishi'
     
     def save_model(self, request, obj, form, change):
-        """Save the instance and create answers"""
-        from .models import Answer
-        
-        # Save the question first
-        super().save_model(request, obj, form, change)
-        
-        # Now create/update answers
-        # Delete old answers
-        obj.answers.all().delete()
-        
-        # Create new answers from form data
-        answers_data = [
-            ('A', form.cleaned_data.get('answer_a')),
-            ('B', form.cleaned_data.get('answer_b')),
-            ('C', form.cleaned_data.get('answer_c')),
-            ('D', form.cleaned_data.get('answer_d')),
-        ]
-        
+        """
+        Savol va javoblarni saqlash.
+
+        Javoblar o'chirib qayta yaratilmaydi: mavjud qatorlar (id tartibida
+        A, B, C, D) joyida yangilanadi, faqat yetishmagani qo'shiladi va
+        ortig'i o'chiriladi. Shu bilan javob id lari o'zgarmaydi - keshlangan
+        javoblar kaliti va boshlangan urinishlardagi javoblar yaroqli qoladi.
+        """
         correct = form.cleaned_data.get('correct_answer')
-        
-        for letter, text in answers_data:
-            if text:  # Only create if text is provided
-                Answer.objects.create(
-                    question=obj,
-                    text=text,
-                    is_correct=(letter == correct)
-                )
-        
-        print(f"DEBUG: Created {obj.answers.count()} answers for question {obj.number}")
+        wanted = [
+            (text, letter == correct)
+            for letter, text in (
+                ('A', form.cleaned_data.get('answer_a')),
+                ('B', form.cleaned_data.get('answer_b')),
+                ('C', form.cleaned_data.get('answer_c')),
+                ('D', form.cleaned_data.get('answer_d')),
+            )
+            if text
+        ]
+
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+
+            # get_object da oldindan yuklangan javoblar (yangi savolda - bo'sh)
+            existing = sorted(obj.answers.all(), key=lambda ans: ans.pk) if change else []
+            to_update, to_create, to_delete = [], [], []
+            for answer, data in zip_longest(existing, wanted):
+                if data is None:
+                    to_delete.append(answer.pk)
+                elif answer is None:
+                    to_create.append(Answer(question=obj, text=data[0], is_correct=data[1]))
+                elif (answer.text, answer.is_correct) != data:
+                    answer.text, answer.is_correct = data
+                    to_update.append(answer)
+
+            if to_update:
+                Answer.objects.bulk_update(to_update, ['text', 'is_correct'])
+            if to_create:
+                Answer.objects.bulk_create(to_create)
+            if to_delete:
+                Answer.objects.filter(pk__in=to_delete).delete()
+            if to_update or to_create or to_delete:
+                # bulk amallar signal chaqirmaydi - kalit tranzaksiya tugagach tozalanadi
+                transaction.on_commit(lambda: invalidate_answer_key(obj.test_set_id))
 
 
 @admin.register(UserCourseProgress)
 class UserCourseProgressAdmin(admin.ModelAdmin):
-    list_display = ('user', 'course', 'is_completed', 'test_passed', 'test_score', 'started_at')
+    list_display = ('user', 'course', 'completed_modules', 'total_modules', 'is_completed', 'test_passed', 'test_score', 'started_at')
+    list_select_related = ('user', 'course')
     list_filter = ('is_completed', 'test_passed', 'course')
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'course__name')
-    readonly_fields = ('started_at', 'completed_at')
+    readonly_fields = ('started_at', 'completed_at', 'completed_modules', 'total_modules')
 
 
 @admin.register(UserModuleProgress)
 class UserModuleProgressAdmin(admin.ModelAdmin):
     list_display = ('user', 'module', 'viewed_presentation', 'watched_video', 'is_completed')
+    list_select_related = ('user', 'module__course')
     list_filter = ('is_completed', 'module__course')
     search_fields = ('user__email', 'module__name')
     readonly_fields = ('completed_at',)
+    
+    def save_model(self, request, obj, form, change):
+        # Qo'lda o'zgartirilgan is_completed (yoki foydalanuvchi/modul) UserCourseProgress
+        # hisoblagichlariga ham o'tishi kerak - eski va yangi kurs qayta hisoblanadi
+        pairs = set(UserModuleProgress.objects.filter(pk=obj.pk).values_list('user_id', 'module__course_id'))
+        super().save_model(request, obj, form, change)
+        pairs.add((obj.user_id, obj.module.course_id))
+        condition = Q()
+        for user_id, course_id in pairs:
+            condition |= Q(user_id=user_id, course_id=course_id)
+        recount_course_progress(UserCourseProgress.objects.filter(condition))
 
 
 @admin.register(UserTestResult)
 class UserTestResultAdmin(admin.ModelAdmin):
     list_display = ('user', 'course', 'percentage', 'passed', 'submitted_at')
+    list_select_related = ('user', 'course')
     list_filter = ('passed', 'course')
     search_fields = ('user__email', 'course__name')
     readonly_fields = ('submitted_at',)
 
 
+@admin.register(TestAttempt)
+class TestAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'course', 'started_at', 'deadline', 'submitted_at')
+    list_select_related = ('user', 'course')
+    list_filter = ('course', 'started_at')
+    search_fields = ('user__email', 'course__name')
+    readonly_fields = ('user', 'course', 'question_ids', 'started_at', 'deadline', 'submitted_at')
+    
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
     list_display = ('user', 'course', 'issued_at', 'download_link')
+    list_select_related = ('user', 'course')
     list_filter = ('course', 'issued_at')
     search_fields = ('user__email', 'user__first_name', 'user__last_name', 'course__name')
-    readonly_fields = ('user', 'course', 'test_result', 'issued_at', 'download_link')
+    readonly_fields = ('user', 'course', 'test_result', 'template_version', 'issued_at', 'download_link')
     
     def download_link(self, obj):
         if obj.certificate_file:
-            return format_html('<a href="{}" target="_blank">Yuklab olish</a>', obj.certificate_file.url)
+            # Fayl himoyalangan - to'g'ridan-to'g'ri media URL emas, yuklab olish view i orqali
+            return format_html('<a href="{}" target="_blank">Yuklab olish</a>',
+                               reverse('main:download_certificate', args=[obj.pk]))
         return '-'
     download_link.short_description = 'Sertifikat'
 
 
+@admin.register(CertificateJob)
+class CertificateJobAdmin(admin.ModelAdmin):
+    list_display = ('user', 'course', 'status', 'attempts', 'run_after', 'created_at')
+    list_select_related = ('user', 'course')
+    list_filter = ('status', 'course')
+    search_fields = ('user__email', 'course__name')
+    readonly_fields = ('user', 'course', 'test_result', 'attempts', 'last_error', 'created_at', 'updated_at')
+    actions = ['requeue_jobs']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Xato vazifalarni qayta navbatga qo\'yish')
+    def requeue_jobs(self, request, queryset):
+        from .certificate_queue import requeue_failed_jobs
+        requeued, skipped = requeue_failed_jobs(queryset)
+        message = f"{requeued} ta vazifa navbatga qaytarildi"
+        if skipped:
+            # Xato bo'lmagan, eskirgan yoki faol vazifasi bor juftliklar
+            message += f", {skipped} ta o'tkazib yuborildi"
+        self.message_user(request, message)
+
+
 # Saralash testi admin
 @admin.register(AssessmentTest)
 class AssessmentTestAdmin(admin.ModelAdmin):
     list_display = ('title', 'test_set', 'time_limit', 'pass_percentage', 'is_active', 'created_at')
+    list_select_related = ('test_set',)
     list_filter = ('is_active', 'created_at')
     search_fields = ('title', 'description')
     readonly_fields = ('created_at', 'updated_at')
@@ -329,6 +458,7 @@ class AssessmentTestAdmin(admin.ModelAdmin):
 @admin.register(AssessmentTestResult)
 class AssessmentTestResultAdmin(admin.ModelAdmin):
     list_display = ('user', 'assessment_test', 'percentage', 'passed', 'correct_answers', 'total_questions', 'submitted_at')
+    list_select_related = ('user', 'assessment_test')
     list_filter = ('passed', 'assessment_test', 'submitted_at')
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
     readonly_fields = ('user', 'assessment_test', 'score', 'total_questions', 'correct_answers', 
@@ -338,3 +468,11 @@ class AssessmentTestResultAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
+
+# OTMlar ma'lumotnomasi (sync_universities buyrug'i bilan to'ldiriladi)
+@admin.register(University)
+class UniversityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'external_id', 'is_active', 'synced_at')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'external_id')
+    readonly_fields = ('synced_at',)
@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.db.models import Min, Q
+
+
+ANSWER_KEY_TIMEOUT = 60 * 60 * 24  # 24 soat
+
+
+def _cache_key(test_set_id):
+    return f'answer_key:{test_set_id}'
+
+
+def get_answer_key(test_set_id):
+    """
+    Test to'plami uchun javoblar kalitini qaytaradi: {savol_id: to'g'ri_javob_id}.
+
+    Kalit bitta so'rov bilan quriladi va keshda saqlanadi. To'g'ri javobi
+    belgilanmagan savollar ham kalitda qoladi (qiymati None), shuning uchun
+    len(key) to'plamdagi savollar soniga teng.
+    """
+    if not test_set_id:
+        return {}
+
+    key = cache.get(_cache_key(test_set_id))
+    if key is None:
+        from .models import Question
+
+        rows = Question.objects.filter(test_set_id=test_set_id).annotate(
+            correct_id=Min('answers__id', filter=Q(answers__is_correct=True))
+        ).values_list('id', 'correct_id')
+        key = dict(rows)
+        cache.set(_cache_key(test_set_id), key, ANSWER_KEY_TIMEOUT)
+    return key
+
+
+def invalidate_answer_key(test_set_id):
+    """Test to'plami javoblar kalitini keshdan o'chirish"""
+    if test_set_id:
+        cache.delete(_cache_key(test_set_id))
+
+
+def grade_answers(answer_key, answers, question_ids=None):
+    """
+    Foydalanuvchi javoblarini kalit bo'yicha tekshiradi.
+
+    answers - {"savol_id": "javob_id"} ko'rinishidagi lug'at (JSON dan keladi).
+    question_ids berilsa, faqat shu savollar baholanadi (masalan, urinishda
+    foydalanuvchiga ko'rsatilgan savollar), aks holda butun to'plam.
+    Returns: (to'g'ri javoblar soni, jami savollar soni)
+    """
+    if question_ids is None:
+        question_ids = answer_key.keys()
+
+    total_questions = 0
+    correct_answers = 0
+    for question_id in question_ids:
+        total_questions += 1
+        correct_id = answer_key.get(question_id)
+        user_answer_id = answers.get(str(question_id))
+        if correct_id is not None and user_answer_id and str(user_answer_id) == str(correct_id):
+            correct_answers += 1
+    return correct_answers, total_questions
@@ -0,0 +1,66 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageDraw, ImageOps
+
+
+# Sarlavha (header), sozlamalar va admin panel uchun kichik avatar
+AVATAR_SMALL_SIZE = 160
+# Sertifikatdagi doira (100pt ni 3x aniqlikda chizish uchun)
+AVATAR_CERTIFICATE_SIZE = 300
+# Sertifikat fon rangi - doiradan tashqaridagi qism shu rang bilan to'ldiriladi
+CERTIFICATE_BACKGROUND = (250, 248, 243)
+
+
+def _encode(image, fmt, **params):
+    buffer = BytesIO()
+    # EXIF va boshqa metama'lumotlar yozilmaydi
+    image.save(buffer, fmt, **params)
+    return ContentFile(buffer.getvalue())
+
+
+def make_small_avatar(image):
+    """Kvadrat, kichik WEBP avatar"""
+    small = ImageOps.fit(image, (AVATAR_SMALL_SIZE, AVATAR_SMALL_SIZE), Image.LANCZOS)
+    return _encode(small, 'WEBP', quality=82, method=6)
+
+
+def make_certificate_avatar(image):
+    """Sertifikat foniga joylashtirilgan, doira shaklida kesilgan JPEG"""
+    size = AVATAR_CERTIFICATE_SIZE
+    square = ImageOps.fit(image, (size, size), Image.LANCZOS)
+
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+
+    output = Image.new('RGB', (size, size), CERTIFICATE_BACKGROUND)
+    output.paste(square, (0, 0), mask)
+    return _encode(output, 'JPEG', quality=88, optimize=True)
+
+
+def build_avatar_derivatives(user):
+    """
+    Yuklangan profil rasmidan hosilalarni yaratish va user ga biriktirish.
+
+    Rasm storage dan alohida fayl sifatida bir marta ochiladi (profile_image
+    allaqachon saqlangan bo'lishi kerak), EXIF bo'yicha to'g'ri burilib, RGB ga
+    o'tkaziladi. Eski hosila fayllar o'chiriladi. Model saqlanmaydi - buni
+    chaqiruvchi qiladi.
+    """
+    old_files = [f for f in (user.avatar_small, user.avatar_certificate) if f]
+
+    if not user.profile_image:
+        for field in old_files:
+            field.delete(save=False)
+        return
+
+    with user.profile_image.storage.open(user.profile_image.name, 'rb') as stored, Image.open(stored) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    for field in old_files:
+        field.delete(save=False)
+
+    base_name = os.path.splitext(os.path.basename(user.profile_image.name))[0]
+    user.avatar_small.save(f'{base_name}_small.webp', make_small_avatar(image), save=False)
+    user.avatar_certificate.save(f'{base_name}_certificate.jpg', make_certificate_avatar(image), save=False)
@@ -0,0 +1,92 @@
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+# Katalog sahifalari shu modellardan quriladi; ulardan biri o'zgarganda
+# versiyasi oshiriladi va sahifalarning eski fragmentlari endi o'qilmaydi
+CATALOG_MODELS = (
+    'Olympiad', 'BuxduOlympiad', 'BuxduOlympiadWinner', 'StateScholarship', 'BuxduScholarship',
+    'BuxduWinnerDatabase', 'OakDatabase', 'Conference', 'DissertationBank', 'ArticleBank',
+    'ResearcherRegulation',
+)
+
+# Fragmentlar muddati: eskirish versiya orqali boshqariladi, muddat esa har bir
+# versiya oshganda egasiz qolgan eski fragmentlar Redis/fayl cache da abadiy
+# qolib ketmasligi uchun
+CATALOG_FRAGMENT_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def _version_key(model_name):
+    return f'catalog_version:{model_name}'
+
+
+def _initial_version():
+    # Versiya kaliti cache dan chiqib ketsa, eski fragmentlar kalitiga
+    # qaytib tushmaslik uchun hisob vaqtdan boshlanadi
+    return int(time.time() * 1000)
+
+
+def get_catalog_versions(model_names):
+    """Berilgan modellarning joriy versiyalari (model_names tartibida)"""
+    keys = [_version_key(name) for name in model_names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _initial_version(), None)
+            versions[key] = cache.get(key, 0)
+    return [versions[key] for key in keys]
+
+
+def bump_catalog_version(model_name):
+    """Model ma'lumotlari o'zgarganda unga bog'liq sahifa fragmentlarini eskirtirish"""
+    key = _version_key(model_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+class CatalogCacheMixin:
+    """
+    Katalog sahifasining kontent qismini modellar versiyasi bo'yicha cache lash.
+
+    Shablon kontentni {% cache catalog_cache_timeout catalog_page catalog_cache_key %}
+    ichiga oladi, querysetlar esa lazy qoldiriladi - cache da bo'lsa bazaga
+    murojaat qilinmaydi. Yangi ma'lumot kalitni o'zgartiradi, shuning uchun
+    eskirish uchun muddat kerak emas; CATALOG_FRAGMENT_TIMEOUT faqat egasiz
+    qolgan eski fragmentlarni cache dan chiqarish uchun.
+    """
+    cache_models = ()
+    # Bugungi sanaga qarab filtrlanadigan sahifalar (kutilayotgan olimpiadalar)
+    cache_vary_on_date = False
+    # Kontentni o'zgartiradigan GET parametrlari
+    cache_vary_on_params = ()
+
+    def get_cache_vary_parts(self):
+        """So'rovga bog'liq kalit qismlari; None - bu sahifa fragmenti cache lanmaydi"""
+        return [f'{name}={self.request.GET.get(name, "")}' for name in self.cache_vary_on_params]
+
+    def get_catalog_cache_key(self):
+        """Fragment kaliti; None - cache lanmaydi"""
+        vary_parts = self.get_cache_vary_parts()
+        if vary_parts is None:
+            return None
+        parts = [type(self).__name__, *get_catalog_versions(self.cache_models)]
+        if self.cache_vary_on_date:
+            parts.append(timezone.localdate().isoformat())
+        parts.extend(f'{name}={value}' for name, value in sorted(self.kwargs.items()))
+        parts.extend(vary_parts)
+        return ':'.join(str(part) for part in parts)
+
+    def get_catalog_cache_timeout(self):
+        return CATALOG_FRAGMENT_TIMEOUT
+
+    def render_to_response(self, context, **response_kwargs):
+        # Kalit get_context_data tugagach (paginatsiya cursor lari tekshirilgach) quriladi
+        key = self.get_catalog_cache_key()
+        context['catalog_cache_key'] = key or ''
+        # 0 - fragment saqlanmaydi
+        context['catalog_cache_timeout'] = self.get_catalog_cache_timeout() if key else 0
+        return super().render_to_response(context, **response_kwargs)
@@ -6,20 +6,19 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.colors import HexColor
 from django.conf import settings
 from io import BytesIO
-from PIL import Image, ImageDraw
+from functools import lru_cache
+from PIL import Image, ImageOps
 import os
 
 
-def generate_certificate(user, course, test_result):
-    """
-    Generate a modern, elegant PDF certificate for course completion
-    """
-    buffer = BytesIO()
-    
-    # Create PDF in landscape mode
-    width, height = landscape(A4)
-    c = canvas.Canvas(buffer, pagesize=landscape(A4))
-    
+# Statik maket (fon, ramkalar, muhr, imzo, footer) o'zgartirilganda oshiriladi
+TEMPLATE_VERSION = 1
+
+PAGE_SIZE = landscape(A4)
+
+
+def _draw_static_layer(c, width, height):
+    """Barcha sertifikatlar uchun bir xil bo'lgan qism"""
     # Elegant gradient background
     # Main background - soft cream
     c.setFillColor(HexColor('#FAF8F3'))
@@ -75,81 +74,11 @@ def generate_certificate(user, course, test_result):
     c.setFillColor(HexColor('#4B5563'))
     c.drawCentredString(width/2, height-145, "Ushbu sertifikat faxr bilan quyidagi shaxsga beriladi:")
     
-    # User photo or elegant initial circle
-    photo_size = 100
-    photo_x = width/2 - photo_size/2
-    photo_y = height - 290
-    
-    try:
-        if user.profile_picture:
-            # Draw user photo with circular mask
-            img_path = user.profile_picture.path
-            img = Image.open(img_path)
-            img = img.convert("RGB")
-            
-            # Create circular mask
-            mask = Image.new('L', (photo_size*3, photo_size*3), 0)
-            draw = ImageDraw.Draw(mask)
-            draw.ellipse((0, 0, photo_size*3, photo_size*3), fill=255)
-            
-            img = img.resize((photo_size*3, photo_size*3))
-            output = Image.new('RGB', (photo_size*3, photo_size*3), (250, 248, 243))
-            output.paste(img, (0, 0), mask)
-            
-            img_reader = ImageReader(output)
-            c.drawImage(img_reader, photo_x-photo_size, photo_y-photo_size, 
-                       width=photo_size*3, height=photo_size*3, mask='auto')
-        else:
-            # Elegant gradient circle for initials
-            # Outer gold ring
-            c.setStrokeColor(HexColor('#D4AF37'))
-            c.setLineWidth(3)
-            c.circle(width/2, photo_y + photo_size/2, photo_size/2 + 5, fill=False, stroke=True)
-            
-            # Inner gradient circle (indigo to purple)
-            c.setFillColor(HexColor('#4F46E5'))
-            c.circle(width/2, photo_y + photo_size/2, photo_size/2, fill=True, stroke=False)
-            
-            # Initials in elegant white
-            c.setFillColor(HexColor('#FFFFFF'))
-            c.setFont("Helvetica-BoldOblique", 48)
-            initials = f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
-            c.drawCentredString(width/2, photo_y + photo_size/2 - 15, initials.upper())
-    except Exception as e:
-        print(f"Error adding photo: {e}")
-        # Elegant default circle
-        c.setStrokeColor(HexColor('#D4AF37'))
-        c.setLineWidth(3)
-        c.circle(width/2, photo_y + photo_size/2, photo_size/2 + 5, fill=False, stroke=True)
-        c.setFillColor(HexColor('#4F46E5'))
-        c.circle(width/2, photo_y + photo_size/2, photo_size/2, fill=True, stroke=False)
-        c.setFillColor(HexColor('#FFFFFF'))
-        c.setFont("Helvetica-BoldOblique", 48)
-        initials = f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
-        c.drawCentredString(width/2, photo_y + photo_size/2 - 15, initials.upper())
-    
-    # User full name in elegant script with gold color - ITALIC
-    c.setFillColor(HexColor('#D4AF37'))  # Gold color
-    c.setFont("Helvetica-BoldOblique", 38)  # Italic
-    full_name = f"{user.first_name} {user.last_name}"
-    c.drawCentredString(width/2, height-320, full_name)
-    
-    # Decorative underline for name
-    c.setStrokeColor(HexColor('#D4AF37'))
-    c.setLineWidth(1.5)
-    name_width = len(full_name) * 12
-    c.line(width/2-name_width, height-332, width/2+name_width, height-332)
-    
     # Course completion text in italic (more compact)
     c.setFont("Helvetica-Oblique", 13)
     c.setFillColor(HexColor('#6B7280'))
     c.drawCentredString(width/2, height-365, "Quyidagi onlayn ta'lim kursini muvaffaqiyatli tugatdi:")
     
-    # Course name in prominent style
-    c.setFont("Helvetica-BoldOblique", 22)
-    c.setFillColor(HexColor('#4F46E5'))
-    c.drawCentredString(width/2, height-400, f'"{course.name}"')
-    
     # Test score in elegant box
     score_box_y = height - 450
     box_width = 380
@@ -160,12 +89,6 @@ def generate_certificate(user, course, test_result):
     c.setFillColor(HexColor('#10B981'))
     c.roundRect(box_x, score_box_y, box_width, box_height, 10, fill=True, stroke=False)
     
-    # Score text
-    c.setFont("Helvetica-BoldOblique", 16)
-    c.setFillColor(HexColor('#FFFFFF'))
-    score_text = f"Natija: {test_result.percentage}%  •  {test_result.correct_answers}/{test_result.total_questions} to'g'ri javob"
-    c.drawCentredString(width/2, score_box_y + 15, score_text)
-    
     # Date and signature section with elegant design
     date_y = 120
     
@@ -181,10 +104,6 @@ def generate_certificate(user, course, test_result):
     c.setLineWidth(1)
     c.roundRect(75, date_y - 15, 140, 30, 5, fill=False, stroke=True)
     
-    c.setFont("Helvetica-Bold", 13)
-    c.setFillColor(HexColor('#1F2937'))
-    c.drawCentredString(145, date_y - 5, test_result.submitted_at.strftime("%d.%m.%Y"))
-    
     # Right side - Signature section
     c.setFont("Helvetica-Oblique", 11)
     c.setFillColor(HexColor('#6B7280'))
@@ -230,6 +149,143 @@ def generate_certificate(user, course, test_result):
     # Small decorative circles
     c.circle(60, 60, 4, fill=True, stroke=False)
     c.circle(width-60, 60, 4, fill=True, stroke=False)
+
+
+@lru_cache(maxsize=4)
+def _static_layer(version):
+    """
+    Statik qatlamni bir marta chizib, PDF operatorlari ko'rinishida saqlaydi.
+
+    Returns: (ishlatilgan shriftlar, operatorlar) - shriftlar ro'yxati yangi
+    hujjatda bir xil ichki nomlarni (/F1, /F2, ...) olish uchun kerak.
+    """
+    c = canvas.Canvas(BytesIO(), pagesize=PAGE_SIZE)
+    start = len(c._code)
+    _draw_static_layer(c, *PAGE_SIZE)
+    fonts = tuple(c._doc.fontMapping.items())
+    return fonts, tuple(c._code[start:])
+
+
+def _stamp_static_layer(c):
+    """Keshdagi statik qatlamni yangi canvas ga qo'yish; imkon bo'lmasa, qayta chizish"""
+    fonts, code = _static_layer(TEMPLATE_VERSION)
+    for font_name, internal_name in fonts:
+        if c._doc.getInternalFontName(font_name) != internal_name:
+            _draw_static_layer(c, *PAGE_SIZE)
+            return
+    c._code.append('q')
+    c._code.extend(code)
+    c._code.append('Q')
+
+
+def _certificate_avatar(user):
+    """
+    Sertifikat uchun tayyor doira shaklidagi avatar.
+
+    Hosila bo'lmasa (masalan, eski yuklangan rasmlar), asl rasmdan shu yerning
+    o'zida tayyorlanadi.
+    """
+    if getattr(user, 'avatar_certificate', None):
+        return ImageReader(user.avatar_certificate.path)
+    if getattr(user, 'profile_image', None):
+        from main.avatars import make_certificate_avatar
+        with Image.open(user.profile_image.path) as source:
+            image = ImageOps.exif_transpose(source).convert('RGB')
+        return ImageReader(BytesIO(make_certificate_avatar(image).read()))
+    return None
+
+
+def generate_certificate(user, course, test_result, prerendered=True):
+    """
+    Generate a modern, elegant PDF certificate for course completion.
+
+    The static layout is taken from a pre-rendered layer (see _static_layer);
+    only the name, course, score, date and avatar are drawn per certificate.
+    """
+    buffer = BytesIO()
+    
+    # Create PDF in landscape mode
+    width, height = PAGE_SIZE
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+    
+    if prerendered:
+        _stamp_static_layer(c)
+    else:
+        _draw_static_layer(c, width, height)
+    
+    # User photo or elegant initial circle
+    photo_size = 100
+    photo_x = width/2 - photo_size/2
+    photo_y = height - 290
+    
+    try:
+        avatar = _certificate_avatar(user)
+        if avatar is not None:
+            # Pre-masked circle from the upload-time derivative (see main/avatars.py)
+            c.drawImage(avatar, photo_x, photo_y, width=photo_size, height=photo_size)
+            
+            # Outer gold ring
+            c.setStrokeColor(HexColor('#D4AF37'))
+            c.setLineWidth(3)
+            c.circle(width/2, photo_y + photo_size/2, photo_size/2 + 5, fill=False, stroke=True)
+        else:
+            # Elegant gradient circle for initials
+            # Outer gold ring
+            c.setStrokeColor(HexColor('#D4AF37'))
+            c.setLineWidth(3)
+            c.circle(width/2, photo_y + photo_size/2, photo_size/2 + 5, fill=False, stroke=True)
+            
+            # Inner gradient circle (indigo to purple)
+            c.setFillColor(HexColor('#4F46E5'))
+            c.circle(width/2, photo_y + photo_size/2, photo_size/2, fill=True, stroke=False)
+            
+            # Initials in elegant white
+            c.setFillColor(HexColor('#FFFFFF'))
+            c.setFont("Helvetica-BoldOblique", 48)
+            initials = f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
+            c.drawCentredString(width/2, photo_y + photo_size/2 - 15, initials.upper())
+    except Exception as e:
+        print(f"Error adding photo: {e}")
+        # Elegant default circle
+        c.setStrokeColor(HexColor('#D4AF37'))
+        c.setLineWidth(3)
+        c.circle(width/2, photo_y + photo_size/2, photo_size/2 + 5, fill=False, stroke=True)
+        c.setFillColor(HexColor('#4F46E5'))
+        c.circle(width/2, photo_y + photo_size/2, photo_size/2, fill=True, stroke=False)
+        c.setFillColor(HexColor('#FFFFFF'))
+        c.setFont("Helvetica-BoldOblique", 48)
+        initials = f"{user.first_name[0] if user.first_name else ''}{user.last_name[0] if user.last_name else ''}"
+        c.drawCentredString(width/2, photo_y + photo_size/2 - 15, initials.upper())
+    
+    # User full name in elegant script with gold color - ITALIC
+    c.setFillColor(HexColor('#D4AF37'))  # Gold color
+    c.setFont("Helvetica-BoldOblique", 38)  # Italic
+    full_name = f"{user.first_name} {user.last_name}"
+    c.drawCentredString(width/2, height-320, full_name)
+    
+    # Decorative underline for name
+    c.setStrokeColor(HexColor('#D4AF37'))
+    c.setLineWidth(1.5)
+    name_width = len(full_name) * 12
+    c.line(width/2-name_width, height-332, width/2+name_width, height-332)
+    
+    # Course name in prominent style
+    c.setFont("Helvetica-BoldOblique", 22)
+    c.setFillColor(HexColor('#4F46E5'))
+    c.drawCentredString(width/2, height-400, f'"{course.name}"')
+    
+    # Score text
+    score_box_y = height - 450
+    c.setFont("Helvetica-BoldOblique", 16)
+    c.setFillColor(HexColor('#FFFFFF'))
+    score_text = f"Natija: {test_result.percentage}%  •  {test_result.correct_answers}/{test_result.total_questions} to'g'ri javob"
+    c.drawCentredString(width/2, score_box_y + 15, score_text)
+    
+    # Date value
+    date_y = 120
+    c.setFont("Helvetica-Bold", 13)
+    c.setFillColor(HexColor('#1F2937'))
+    c.drawCentredString(145, date_y - 5, test_result.submitted_at.strftime("%d.%m.%Y"))
     
     c.showPage()
     c.save()
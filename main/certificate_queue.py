@@ -0,0 +1,151 @@
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+
+RETRY_BASE_DELAY_SECONDS = 30
+
+
+def enqueue_certificate(user, course, test_result):
+    """
+    Sertifikat yaratish vazifasini navbatga qo'yish.
+
+    Sertifikat allaqachon berilgan yoki navbatda turgan bo'lsa, yangi vazifa
+    yaratilmaydi. Returns: 'issued', 'pending' yoki 'failed'
+    """
+    from .models import Certificate, CertificateJob
+
+    if Certificate.objects.filter(user=user, course=course).exists():
+        return 'issued'
+
+    active_job = CertificateJob.objects.filter(
+        user=user, course=course, status__in=['pending', 'processing']
+    ).first()
+    if active_job:
+        return active_job.status
+
+    try:
+        with transaction.atomic():
+            CertificateJob.objects.create(user=user, course=course, test_result=test_result)
+    except IntegrityError:
+        # Parallel so'rov vazifani birinchi yaratdi (cert_job_one_active) yoki bu
+        # natija uchun vazifa allaqachon bor - mavjud vazifa holati qaytariladi
+        status = CertificateJob.objects.filter(
+            user=user, course=course
+        ).order_by('-created_at').values_list('status', flat=True).first()
+        return status or 'pending'
+    return 'pending'
+
+
+def issue_certificate(user, course, test_result):
+    """PDF sertifikatni yaratib, Certificate yozuvi bilan saqlash (bir kurs uchun bir marta)"""
+    from .certificate_generator import generate_certificate, TEMPLATE_VERSION
+    from .models import Certificate
+
+    certificate = Certificate.objects.filter(user=user, course=course).first()
+    if certificate:
+        return certificate
+
+    pdf_buffer = generate_certificate(user, course, test_result)
+    certificate = Certificate(user=user, course=course, test_result=test_result, template_version=TEMPLATE_VERSION)
+    certificate.certificate_file.save(
+        f'certificate_{user.id}_{course.id}_{timezone.now().strftime("%Y%m%d")}.pdf',
+        ContentFile(pdf_buffer.getvalue())
+    )
+    return certificate
+
+
+def claim_next_job():
+    """
+    Navbatdagi bitta vazifani olish va 'processing' holatiga o'tkazish.
+
+    SELECT ... FOR UPDATE SKIP LOCKED tufayli bir nechta worker bir vazifani
+    ikki marta olmaydi.
+    """
+    from .models import CertificateJob
+
+    with transaction.atomic():
+        job = CertificateJob.objects.select_for_update(skip_locked=True).filter(
+            status='pending', run_after__lte=timezone.now()
+        ).order_by('run_after', 'id').first()
+        if job is None:
+            return None
+        job.status = 'processing'
+        job.attempts += 1
+        job.save(update_fields=['status', 'attempts', 'updated_at'])
+    return job
+
+
+def process_job(job, max_retries=3):
+    """Vazifani bajarish; xatolik bo'lsa, kechikish bilan qayta navbatga qo'yish"""
+    from .models import CertificateJob
+
+    job = CertificateJob.objects.select_related('user', 'course', 'test_result').get(pk=job.pk)
+    try:
+        issue_certificate(job.user, job.course, job.test_result)
+    except Exception as e:
+        job.last_error = str(e)
+        if job.attempts < max_retries:
+            job.status = 'pending'
+            job.run_after = timezone.now() + timedelta(
+                seconds=RETRY_BASE_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = 'failed'
+        job.save(update_fields=['status', 'last_error', 'run_after', 'updated_at'])
+        return False
+
+    job.status = 'done'
+    job.last_error = ''
+    job.save(update_fields=['status', 'last_error', 'updated_at'])
+    return True
+
+
+def requeue_stale_jobs(older_than_minutes=10):
+    """To'xtab qolgan worker qoldirgan 'processing' vazifalarni navbatga qaytarish"""
+    from .models import CertificateJob
+
+    return CertificateJob.objects.filter(
+        status='processing',
+        updated_at__lt=timezone.now() - timedelta(minutes=older_than_minutes)
+    ).update(status='pending', run_after=timezone.now())
+
+
+def requeue_failed_jobs(queryset):
+    """
+    Tanlangan 'failed' vazifalarni navbatga qaytarish (admin amali).
+
+    Har bir (user, course) uchun faqat eng oxirgi xato vazifa qaytariladi; faol
+    ('pending'/'processing') vazifasi bor juftliklar o'tkazib yuboriladi -
+    cert_job_one_active cheklovi buzilmaydi va worker ushlab turgan vazifa
+    ikkinchi marta bajarilmaydi. Returns: (qaytarilgan, o'tkazib yuborilgan)
+    """
+    from .models import CertificateJob
+
+    selected = list(queryset.order_by('-created_at', '-id').values_list('id', 'status', 'user_id', 'course_id'))
+    pairs = {(user_id, course_id) for _, _, user_id, course_id in selected}
+    active = set(CertificateJob.objects.filter(
+        status__in=['pending', 'processing'],
+        user_id__in={user_id for user_id, _ in pairs},
+        course_id__in={course_id for _, course_id in pairs},
+    ).values_list('user_id', 'course_id'))
+
+    job_ids = []
+    for job_id, status, user_id, course_id in selected:
+        if status == 'failed' and (user_id, course_id) not in active:
+            job_ids.append(job_id)
+            active.add((user_id, course_id))
+
+    requeued = 0
+    if job_ids:
+        try:
+            with transaction.atomic():
+                requeued = CertificateJob.objects.filter(pk__in=job_ids, status='failed').update(
+                    status='pending', attempts=0, run_after=timezone.now()
+                )
+        except IntegrityError:
+            # Shu orada parallel so'rov faol vazifa yaratdi - hech narsa o'zgartirilmaydi
+            requeued = 0
+    return requeued, len(selected) - requeued
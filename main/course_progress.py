@@ -0,0 +1,152 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def _module_counts():
+    """UserCourseProgress qatori uchun haqiqiy (total, completed) modullar soni - subquery lar"""
+    from .models import Module, UserModuleProgress
+
+    total = Module.objects.filter(
+        course=OuterRef('course')
+    ).order_by().values('course').annotate(c=Count('pk')).values('c')
+    completed = UserModuleProgress.objects.filter(
+        user=OuterRef('user'),
+        module__course=OuterRef('course'),
+        is_completed=True
+    ).order_by().values('module__course').annotate(c=Count('pk')).values('c')
+    return (
+        Coalesce(Subquery(total, output_field=IntegerField()), 0),
+        Coalesce(Subquery(completed, output_field=IntegerField()), 0),
+    )
+
+
+def get_course_progress(user, course):
+    """
+    Foydalanuvchining kurs progressi; birinchi marta so'ralganda hisoblagichlar
+    mavjud UserModuleProgress yozuvlaridan to'ldirilib yaratiladi.
+    """
+    from .models import UserCourseProgress, UserModuleProgress
+
+    progress = UserCourseProgress.objects.filter(user=user, course=course).first()
+    if progress:
+        return progress
+
+    try:
+        with transaction.atomic():
+            return UserCourseProgress.objects.create(
+                user=user,
+                course=course,
+                total_modules=course.modules.count(),
+                completed_modules=UserModuleProgress.objects.filter(
+                    user=user, module__course=course, is_completed=True
+                ).count(),
+            )
+    except IntegrityError:
+        # Parallel so'rov allaqachon yaratgan
+        return UserCourseProgress.objects.get(user=user, course=course)
+
+
+def recount_course_progress(queryset=None):
+    """
+    Hisoblagichlarni UserModuleProgress va Module jadvallaridan qayta hisoblash.
+
+    Faqat noto'g'ri qiymatli qatorlar yangilanadi. Returns: yangilangan qatorlar soni
+    """
+    from .models import UserCourseProgress
+
+    if queryset is None:
+        queryset = UserCourseProgress.objects.all()
+    total, completed = _module_counts()
+    drifted = queryset.annotate(actual_total=total, actual_completed=completed).filter(
+        ~Q(total_modules=F('actual_total')) | ~Q(completed_modules=F('actual_completed'))
+    ).values('pk')
+    return UserCourseProgress.objects.filter(pk__in=drifted).update(
+        total_modules=total, completed_modules=completed
+    )
+
+
+# Modul hodisalari -> UserModuleProgress maydonlari
+MODULE_EVENT_FIELDS = {
+    'presentation': 'viewed_presentation',
+    'video': 'watched_video',
+}
+MODULE_EVENT_TYPES = set(MODULE_EVENT_FIELDS) | {'complete'}
+MAX_MODULE_EVENTS = 100
+
+
+def apply_module_events(user, events):
+    """
+    Bir nechta modul hodisasini bitta tranzaksiyada qo'llash.
+
+    events: [(module_id, event_type), ...]. Progress qatorlari
+    INSERT ... ON CONFLICT DO UPDATE bilan yoziladi - har bir bayroqlar
+    to'plami uchun bitta so'rov, shuning uchun True qiymat hech qachon
+    False ga qaytmaydi. Tugatilgan modullar kurs hisoblagichini F() bilan
+    oshiradi. Returns: {module_id: {...joriy holat...}} faqat mavjud modullar uchun
+    """
+    from .models import Module, UserCourseProgress, UserModuleProgress
+
+    flags = {}
+    for module_id, event_type in events:
+        module_flags = flags.setdefault(module_id, set())
+        if event_type != 'complete':
+            module_flags.add(MODULE_EVENT_FIELDS[event_type])
+    completing = {module_id for module_id, event_type in events if event_type == 'complete'}
+
+    modules = {
+        m.pk: m for m in Module.objects.filter(pk__in=flags, course__is_active=True).select_related('course')
+    }
+    if not modules:
+        return {}
+
+    # Hisoblagich oshirilishidan oldin kurs progressi mavjud bo'lishi kerak
+    for course in {modules[pk].course for pk in completing if pk in modules}:
+        get_course_progress(user, course)
+
+    # Bir xil bayroqlar to'plamiga ega qatorlar bitta upsert bilan yoziladi
+    groups = {}
+    for module_id in modules:
+        groups.setdefault(frozenset(flags[module_id]), []).append(module_id)
+
+    now = timezone.now()
+    with transaction.atomic():
+        for fields, module_ids in groups.items():
+            rows = [
+                UserModuleProgress(user=user, module_id=module_id, **{field: True for field in fields})
+                for module_id in module_ids
+            ]
+            if fields:
+                UserModuleProgress.objects.bulk_create(
+                    rows, update_conflicts=True, unique_fields=['user', 'module'], update_fields=sorted(fields)
+                )
+            else:
+                UserModuleProgress.objects.bulk_create(rows, ignore_conflicts=True)
+
+        completing = [pk for pk in completing if pk in modules]
+        if completing:
+            newly_completed = list(
+                UserModuleProgress.objects.select_for_update().filter(
+                    user=user, module_id__in=completing, is_completed=False
+                ).values_list('module_id', flat=True)
+            )
+            if newly_completed:
+                UserModuleProgress.objects.filter(user=user, module_id__in=newly_completed).update(
+                    is_completed=True, completed_at=now
+                )
+                per_course = {}
+                for module_id in newly_completed:
+                    course_id = modules[module_id].course_id
+                    per_course[course_id] = per_course.get(course_id, 0) + 1
+                for course_id, count in per_course.items():
+                    UserCourseProgress.objects.filter(user=user, course_id=course_id).update(
+                        completed_modules=F('completed_modules') + count
+                    )
+
+    return {
+        row['module_id']: row
+        for row in UserModuleProgress.objects.filter(user=user, module_id__in=modules).values(
+            'module_id', 'viewed_presentation', 'watched_video', 'is_completed'
+        )
+    }
@@ -1,141 +1,217 @@
-from docx import Document
-from django.core.files.base import ContentFile
 import re
+from collections import namedtuple
+from zipfile import BadZipFile
+
+from django.db import transaction
+from docx import Document
+from docx.opc.exceptions import PackageNotFoundError
+
+
+# Savol bloki formati:
+#   ## 1-savol
+#   Savol matni (bir yoki bir necha qator)
+#   A) 1-variant
+#   B) 2-variant
+#   C) 3-variant
+#   D) 4-variant
+#   Javob: A
+_HEADER_RE = re.compile(r'^#{2,}\s*(?:(\d+)\s*-?\s*)?savol\b', re.IGNORECASE)
+_ANSWER_RE = re.compile(r'^([A-Da-d])\)\s*(.+)$')
+_CORRECT_RE = re.compile(r'^javob\s*:\s*(?:([A-Da-d])\b)?', re.IGNORECASE)
+
+MIN_ANSWERS = 2
+
+# line - savol sarlavhasi qatori; answers - [(harf, matn)]
+ParsedQuestion = namedtuple('ParsedQuestion', 'line number text answers correct_answer')
+ImportIssue = namedtuple('ImportIssue', 'line message')
+
+
+class DocxImportReport:
+    """Import natijasi: to'g'ri bloklar, qator raqamli xatolar va yozilgan savollar soni"""
+
+    def __init__(self):
+        self.questions = []
+        self.errors = []
+        self.created = 0
+        self.deleted = 0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def error(self, line, message):
+        self.errors.append(ImportIssue(line, message))
+
+    @property
+    def message(self):
+        if self.ok:
+            return f"{self.created} ta savol muvaffaqiyatli yuklandi"
+        return f"Faylda {len(self.errors)} ta xato topildi, savollar yuklanmadi"
+
+    def as_dict(self):
+        return {
+            'ok': self.ok,
+            'created': self.created,
+            'deleted': self.deleted,
+            'parsed': len(self.questions),
+            'errors': [issue._asdict() for issue in self.errors],
+        }
+
+
+class _Block:
+    def __init__(self, line, number):
+        self.line = line
+        self.number = number
+        self.text_lines = []
+        self.answers = []
+        self.correct_answer = None
+        self.correct_line = None
+
+
+def _close_block(block, report, seen_numbers):
+    """Blokni tekshirib, to'g'ri bo'lsa report.questions ga qo'shish"""
+    errors_before = len(report.errors)
+    label = f"{block.number}-savol"
+
+    if block.number in seen_numbers:
+        report.error(block.line, f"{label} raqami takrorlangan ({seen_numbers[block.number]}-qatorda ham bor)")
+    else:
+        seen_numbers[block.number] = block.line
+    if not block.text_lines:
+        report.error(block.line, f"{label}: savol matni yo'q")
+
+    letters = {}
+    for letter, _, line in block.answers:
+        if letter in letters:
+            report.error(line, f"{label}: {letter}) varianti takrorlangan ({letters[letter]}-qatorda ham bor)")
+        letters.setdefault(letter, line)
+    if len(letters) < MIN_ANSWERS:
+        report.error(block.line, f"{label}: kamida {MIN_ANSWERS} ta javob varianti kerak")
+
+    if block.correct_answer is None:
+        report.error(block.correct_line or block.line, f"{label}: to'g'ri javob (Javob: A) ko'rsatilmagan")
+    elif block.correct_answer not in letters:
+        report.error(block.correct_line, f"{label}: \"Javob: {block.correct_answer}\" - bunday variant yo'q")
+
+    if len(report.errors) == errors_before:
+        report.questions.append(ParsedQuestion(
+            block.line, block.number, '\n'.join(block.text_lines),
+            [(letter, text) for letter, text, _ in block.answers], block.correct_answer,
+        ))
+
+
+def parse_test_lines(lines, report=None):
+    """
+    Matn qatorlaridan savollarni bir o'tishda ajratib olish.
+
+    lines - [(qator_raqami, matn)]. Noto'g'ri bloklar report.errors ga qator
+    raqami bilan yoziladi; to'g'rilari report.questions da qoladi.
+    """
+    report = report or DocxImportReport()
+    seen_numbers = {}
+    block = None
+
+    for line, text in lines:
+        text = text.strip()
+        if not text:
+            continue
+
+        header = _HEADER_RE.match(text)
+        if header:
+            if block is not None:
+                _close_block(block, report, seen_numbers)
+            number = int(header.group(1)) if header.group(1) else (block.number + 1 if block else 1)
+            block = _Block(line, number)
+            continue
+
+        if block is None:
+            report.error(line, "Savol sarlavhasidan (## 1-savol) oldin matn bor")
+            continue
+
+        answer = _ANSWER_RE.match(text)
+        correct = _CORRECT_RE.match(text)
+        if block.correct_line is not None:
+            report.error(line, f"{block.number}-savol: \"Javob:\" qatoridan keyin kutilmagan matn")
+        elif correct:
+            block.correct_line = line
+            block.correct_answer = correct.group(1).upper() if correct.group(1) else None
+        elif answer:
+            block.answers.append((answer.group(1).upper(), answer.group(2).strip(), line))
+        elif block.answers:
+            report.error(line, f"{block.number}-savol: javob variantlari orasida kutilmagan matn")
+        else:
+            block.text_lines.append(text)
+
+    if block is not None:
+        _close_block(block, report, seen_numbers)
+    elif not report.errors:
+        report.error(None, "Faylda birorta ham savol topilmadi")
+    report.errors.sort(key=lambda issue: issue.line or 0)
+    return report
 
 
 def parse_docx_test(docx_file):
     """
-    Parse DOCX test file and return questions with answers.
-    
-    Expected format:
-    ## 1-savol
-    Question text here?
-    A) Answer 1
-    B) Answer 2
-    C) Answer 3
-    D) Answer 4
-    Javob: A
-    
-    Returns: List of dicts with question data
+    DOCX fayldagi savollarni o'qish. Qator raqami - hujjatdagi abzas tartib raqami.
+
+    Returns: DocxImportReport (questions - to'g'ri bloklar, errors - xatolar)
     """
+    report = DocxImportReport()
     try:
-        doc = Document(docx_file)
-        questions_data = []
-        current_question = None
-        current_answers = []
-        correct_answer = None
-        question_number = 0
-        question_text_lines = []
-        
-        for para in doc.paragraphs:
-            text = para.text.strip()
-            
-            if not text:
-                continue
-            
-            print(f"DEBUG: Processing line: {text[:50]}")  # Debug output
-            
-            # Check for question marker: ## N-savol
-            if '##' in text and 'savol' in text.lower():
-                # Save previous question if exists
-                if current_question and current_answers:
-                    questions_data.append({
-                        'number': question_number,
-                        'text': current_question,
-                        'answers': current_answers,
-                        'correct_answer': correct_answer
-                    })
-                    print(f"DEBUG: Saved question {question_number}")
-                
-                # Extract question number
-                match = re.search(r'(\d+)-savol', text)
-                if match:
-                    question_number = int(match.group(1))
-                else:
-                    question_number += 1
-                
-                current_question = None
-                current_answers = []
-                correct_answer = None
-                question_text_lines = []
-                print(f"DEBUG: Started question {question_number}")
-                continue
-            
-            # Check for answer options: A) B) C) D)
-            answer_match = re.match(r'^([A-D])\)\s*(.+)', text)
-            if answer_match:
-                letter = answer_match.group(1)
-                answer_text = answer_match.group(2).strip()
-                current_answers.append({
-                    'letter': letter,
-                    'text': answer_text
-                })
-                print(f"DEBUG: Added answer {letter}")
-                continue
-            
-            # Check for correct answer: Javob: A
-            if text.lower().startswith('javob:'):
-                correct_answer = text.split(':')[1].strip().upper()
-                print(f"DEBUG: Correct answer: {correct_answer}")
-                continue
-            
-            # If not any of above, it's question text
-            if question_number > 0 and not current_question and not text.startswith('##'):
-                current_question = text
-                print(f"DEBUG: Question text: {text[:30]}")
-        
-        # Don't forget last question
-        if current_question and current_answers:
-            questions_data.append({
-                'number': question_number,
-                'text': current_question,
-                'answers': current_answers,
-                'correct_answer': correct_answer
-            })
-            print(f"DEBUG: Saved last question {question_number}")
-        
-        print(f"DEBUG: Total questions parsed: {len(questions_data)}")
-        return questions_data
-    
-    except Exception as e:
-        print(f"Error parsing DOCX: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
-
-
-def save_questions_from_docx(course, docx_file):
+        paragraphs = Document(docx_file).paragraphs
+    except (PackageNotFoundError, BadZipFile, KeyError, ValueError):
+        report.error(None, "DOCX faylni o'qib bo'lmadi")
+        return report
+    return parse_test_lines(((i, para.text) for i, para in enumerate(paragraphs, start=1)), report)
+
+
+def save_questions_from_docx(test_set, docx_file, replace=True):
     """
-    Parse DOCX and save questions to database
+    DOCX dagi savollarni test to'plamiga yuklash.
+
+    Faylda bitta bo'lsa ham xato bo'lsa hech narsa yozilmaydi. Aks holda bitta
+    tranzaksiyada (replace=True bo'lsa) eski savollar o'chiriladi va savollar
+    hamda javoblar ikkita bulk_create bilan yoziladi.
+
+    Returns: DocxImportReport
     """
-    from main.models import Question, Answer
-    
-    questions_data = parse_docx_test(docx_file)
-    
-    if not questions_data:
-        return 0, "DOCX faylni o'qishda xatolik yuz berdi"
-    
-    # Delete old questions for this course
-    Question.objects.filter(course=course).delete()
-    
-    created_count = 0
-    for q_data in questions_data:
-        # Create question
-        question = Question.objects.create(
-            course=course,
-            number=q_data['number'],
-            text=q_data['text']
-        )
-        
-        # Create answers
-        for answer_data in q_data['answers']:
-            is_correct = (answer_data['letter'] == q_data['correct_answer'])
-            Answer.objects.create(
-                question=question,
-                text=answer_data['text'],
-                is_correct=is_correct
-            )
-        
-        created_count += 1
-    
-    return created_count, f"{created_count} ta savol muvaffaqiyatli yuklandi"
+    from .answer_keys import invalidate_answer_key
+    from .models import Question, Answer
+    from .question_sampler import invalidate_question_ids
+    from .signals import mute_answer_key_signals
+
+    report = parse_docx_test(docx_file)
+    if not report.ok:
+        return report
+
+    with transaction.atomic():
+        if replace:
+            # Javoblarning post_delete signali har biri uchun alohida so'rov qiladi, shuning
+            # uchun u shu yerda o'chirib qo'yiladi - kalit baribir tranzaksiya oxirida tozalanadi
+            with mute_answer_key_signals():
+                Answer.objects.filter(question__test_set=test_set).delete()
+            _, deleted = Question.objects.filter(test_set=test_set).delete()
+            report.deleted = deleted.get(Question._meta.label, 0)
+        elif Question.objects.filter(
+            test_set=test_set, number__in=[q.number for q in report.questions]
+        ).exists():
+            report.error(None, "Test to'plamida shu raqamli savollar allaqachon bor")
+            return report
+
+        questions = Question.objects.bulk_create([
+            Question(test_set=test_set, number=q.number, text=q.text) for q in report.questions
+        ], batch_size=1000)
+        Answer.objects.bulk_create([
+            Answer(question=question, text=text, is_correct=letter == parsed.correct_answer)
+            for question, parsed in zip(questions, report.questions)
+            for letter, text in parsed.answers
+        ], batch_size=1000)
+        report.created = len(questions)
+
+        def invalidate_caches():
+            invalidate_answer_key(test_set.pk)
+            invalidate_question_ids(test_set.pk)
+
+        # bulk_create signal chaqirmaydi - keshlar tranzaksiya tugagach tozalanadi
+        transaction.on_commit(invalidate_caches)
+    return report
@@ -1,6 +1,8 @@
 from django import forms
+from django.urls import reverse_lazy
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-import requests
+from .avatars import build_avatar_derivatives
+from .universities import get_university_index, OTHER_CHOICE
 from .models import (
     User, Question, Answer, Course, Module, Announcement, 
     Survey, StateScholarship, BuxduScholarship, Olympiad, 
@@ -8,38 +10,6 @@ from .models import (
 )
 
 
-def get_university_choices():
-    """API dan OTMlar ro'yxatini olish"""
-    try:
-        response = requests.get('https://prof-emis.edu.uz/api/v2/integration/stat/public/university?limit=10000', timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            universities = [('', 'O\'qigan/O\'qiyotgan joyingizni tanlang')]
-            
-            # API to'g'ridan-to'g'ri list qaytaradi
-            if isinstance(data, list):
-                for item in data:
-                    # name_uz, name_en, name_ru kalitlaridan birini olish
-                    name = item.get('name_uz') or item.get('name_en') or item.get('name_ru')
-                    if name:
-                        universities.append((name, name))
-            
-            universities.append(('Boshqa', 'Boshqa'))
-            return universities
-    except Exception as e:
-        print(f"API dan OTM ma'lumotlarini olishda xatolik: {e}")
-    
-    # Agar API ishlamasa, default ro'yxat
-    return [
-        ('', 'O\'qigan/O\'qiyotgan joyingizni tanlang'),
-        ('Toshkent davlat universiteti', 'Toshkent davlat universiteti'),
-        ('O\'zbekiston Milliy universiteti', 'O\'zbekiston Milliy universiteti'),
-        ('Samarqand davlat universiteti', 'Samarqand davlat universiteti'),
-        ('Buxoro davlat universiteti', 'Buxoro davlat universiteti'),
-        ('Boshqa', 'Boshqa'),
-    ]
-
-
 REGION_CHOICES = [
     ('', 'Yashash xududingizni tanlang'),
     ('Toshkent shahri', 'Toshkent shahri'),
@@ -66,6 +36,28 @@ DEGREE_CHOICES = [
 ]
 
 
+# OTM maydoni - matn kiritiladi, variantlar /universities/search/ dan keladi
+UNIVERSITY_WIDGET_ATTRS = {
+    'class': 'form-input',
+    'placeholder': 'O\'qigan/O\'qiyotgan joyingizni yozing',
+    'autocomplete': 'off',
+    'data-university-search': reverse_lazy('main:university_search'),
+}
+
+
+def clean_university_value(value, current=None):
+    """Kiritilgan OTM nomini ro'yxatdagi aniq nomga keltirish"""
+    value = (value or '').strip()
+    if not value:
+        return ''
+    if value == OTHER_CHOICE[0] or value == current:
+        return value
+    name = get_university_index().resolve(value)
+    if name is None:
+        raise forms.ValidationError('OTMni ro\'yxatdan tanlang yoki "Boshqa" deb yozing')
+    return name
+
+
 class UserRegisterForm(UserCreationForm):
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={
         'class': 'form-input',
@@ -87,9 +79,7 @@ class UserRegisterForm(UserCreationForm):
     residence_region = forms.ChoiceField(choices=REGION_CHOICES, required=False, widget=forms.Select(attrs={
         'class': 'form-input',
     }))
-    university = forms.ChoiceField(choices=[], required=False, widget=forms.Select(attrs={
-        'class': 'form-input',
-    }))
+    university = forms.CharField(max_length=200, required=False, widget=forms.TextInput(attrs=UNIVERSITY_WIDGET_ATTRS))
     academic_degree = forms.ChoiceField(choices=DEGREE_CHOICES, required=False, widget=forms.Select(attrs={
         'class': 'form-input',
     }))
@@ -100,9 +90,6 @@ class UserRegisterForm(UserCreationForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Dinamik OTM choices
-        self.fields['university'].choices = get_university_choices()
-        
         self.fields['password1'].widget.attrs.update({
             'class': 'form-input',
             'placeholder': 'Parol'
@@ -112,6 +99,9 @@ class UserRegisterForm(UserCreationForm):
             'placeholder': 'Parolni tasdiqlang'
         })
 
+    def clean_university(self):
+        return clean_university_value(self.cleaned_data.get('university'))
+
 
 class UserLoginForm(AuthenticationForm):
     username = forms.EmailField(widget=forms.EmailInput(attrs={
@@ -132,9 +122,7 @@ class UserUpdateForm(forms.ModelForm):
     residence_region = forms.ChoiceField(choices=REGION_CHOICES, required=False, widget=forms.Select(attrs={
         'class': 'form-input',
     }))
-    university = forms.ChoiceField(choices=[], required=False, widget=forms.Select(attrs={
-        'class': 'form-input',
-    }))
+    university = forms.CharField(max_length=200, required=False, widget=forms.TextInput(attrs=UNIVERSITY_WIDGET_ATTRS))
     academic_degree = forms.ChoiceField(choices=DEGREE_CHOICES, required=False, widget=forms.Select(attrs={
         'class': 'form-input',
     }))
@@ -162,10 +150,30 @@ class UserUpdateForm(forms.ModelForm):
             }),
         }
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Dinamik OTM choices
-        self.fields['university'].choices = get_university_choices()
+    def clean_university(self):
+        # Ro'yxatdan chiqib ketgan eski qiymatni saqlab qolishga ruxsat beriladi
+        return clean_university_value(self.cleaned_data.get('university'), current=self.instance.university)
+    
+    def save(self, commit=True):
+        user = super().save(commit=commit)
+        # Yangi rasm yuklanganda kichik va sertifikat avatarlarini bir marta tayyorlab
+        # qo'yamiz - rasm storage ga yozilgandan keyin (commit=False da save_m2m bilan)
+        if 'profile_image' in self.changed_data:
+            if commit:
+                self._save_avatar_derivatives()
+            else:
+                save_m2m = self.save_m2m
+
+                def save_m2m_and_avatars():
+                    save_m2m()
+                    self._save_avatar_derivatives()
+
+                self.save_m2m = save_m2m_and_avatars
+        return user
+
+    def _save_avatar_derivatives(self):
+        build_avatar_derivatives(self.instance)
+        self.instance.save(update_fields=['avatar_small', 'avatar_certificate'])
 
 
 # Question with Answers Form
@@ -207,8 +215,8 @@ class QuestionWithAnswersForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if self.instance.pk:
-            # Load existing answers
-            answers = list(self.instance.answers.all().order_by('id'))
+            # Load existing answers (QuestionAdmin.get_object da oldindan yuklangan)
+            answers = sorted(self.instance.answers.all(), key=lambda ans: ans.pk)
             if len(answers) >= 4:
                 self.fields['answer_a'].initial = answers[0].text
                 self.fields['answer_b'].initial = answers[1].text
@@ -0,0 +1,98 @@
+import time
+
+from django.core.cache import cache
+
+
+# Bosh sahifa bloklari uchun cache muddati (signal lar orqali oldinroq tozalanadi)
+HOME_CACHE_TIMEOUT = 60 * 60
+# Sovuq cache da faqat bitta jarayon bazaga murojaat qiladi, qolganlari shuncha kutadi
+HOME_CACHE_LOCK_TIMEOUT = 10
+HOME_CACHE_WAIT_SECONDS = 2
+HOME_CACHE_POLL_INTERVAL = 0.05
+
+# Iqtidorli talabalar bloki faqat shu maydonlar o'zgarganda yangilanadi
+# (masalan, har bir kirishda last_login saqlanishi cache ni tozalamasligi uchun)
+TALENTED_STUDENT_FIELDS = ('status', 'first_name', 'last_name', 'email', 'phone_number', 'profile_image', 'created_at')
+
+
+def _load_counts():
+    from .models import Olympiad, StateScholarship, BuxduScholarship, Course, ArticleBank
+
+    return {
+        'olympiad_count': Olympiad.objects.count(),
+        'scholarship_count': StateScholarship.objects.count() + BuxduScholarship.objects.count(),
+        'course_count': Course.objects.count(),
+        'article_count': ArticleBank.objects.count(),
+    }
+
+
+def _load_announcements():
+    from .models import Announcement
+
+    return list(Announcement.objects.order_by('-created_at')[:3])
+
+
+def _load_talented_students():
+    from .models import User
+
+    return list(
+        User.objects.filter(status='iqtidorli').only(*TALENTED_STUDENT_FIELDS).order_by('-created_at')[:4]
+    )
+
+
+# blok nomi -> (yuklovchi funksiya, bog'liq modellar)
+HOME_BLOCKS = {
+    'counts': (_load_counts, ('Olympiad', 'StateScholarship', 'BuxduScholarship', 'Course', 'ArticleBank')),
+    'announcements': (_load_announcements, ('Announcement',)),
+    'talented_students': (_load_talented_students, ('User',)),
+}
+
+
+def _cache_key(name):
+    return f'home:{name}'
+
+
+def get_home_block(name):
+    """
+    Bosh sahifa blokini cache dan olish.
+
+    Cache bo'sh bo'lsa, cache.add() orqali qulf olgan bitta so'rov qiymatni
+    hisoblaydi; qolganlari qisqa vaqt qiymat paydo bo'lishini kutadi va
+    faqat kutish tugasa o'zlari hisoblaydi.
+    """
+    key = _cache_key(name)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    loader = HOME_BLOCKS[name][0]
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, HOME_CACHE_LOCK_TIMEOUT):
+        try:
+            value = loader()
+            cache.set(key, value, HOME_CACHE_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + HOME_CACHE_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(HOME_CACHE_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return loader()
+
+
+def get_home_context():
+    context = dict(get_home_block('counts'))
+    context['announcements'] = get_home_block('announcements')
+    context['talented_students'] = get_home_block('talented_students')
+    return context
+
+
+def invalidate_home_blocks(model_name):
+    """Model o'zgarganda unga bog'liq bloklarni tozalash"""
+    cache.delete_many([
+        _cache_key(name) for name, (_, models) in HOME_BLOCKS.items() if model_name in models
+    ])
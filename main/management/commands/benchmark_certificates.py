@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.certificate_generator import generate_certificate
+from main.models import User, Course, UserTestResult
+
+
+class Command(BaseCommand):
+    help = "Sertifikat yaratish tezligini o'lchash (sertifikat/soniya): statik qatlam keshi bilan va kechsiz"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Har bir usulda yaratiladigan sertifikatlar soni')
+
+    def handle(self, *args, **options):
+        count = options['count']
+
+        # Bazaga yozilmaydigan namunaviy obyektlar
+        user = User(first_name='Jasurbek', last_name='Davletov', email='benchmark@example.com')
+        course = Course(name='Ilmiy tadqiqot metodologiyasi')
+        test_result = UserTestResult(percentage=90, correct_answers=18, total_questions=20, submitted_at=timezone.now())
+
+        # Statik qatlamni oldindan tayyorlab olish (bir martalik xarajat)
+        generate_certificate(user, course, test_result)
+
+        for label, prerendered in (("To'liq chizish", False), ('Statik qatlam keshi', True)):
+            start = time.perf_counter()
+            for _ in range(count):
+                generate_certificate(user, course, test_result, prerendered=prerendered)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{label:<22} {count / elapsed:8.1f} sertifikat/s  ({elapsed * 1000 / count:.2f} ms)")
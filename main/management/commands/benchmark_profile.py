@@ -0,0 +1,71 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from main.models import Course, Module, UserCourseProgress, UserModuleProgress
+from main.views import profile_view
+
+
+class Command(BaseCommand):
+    help = "profile_view ning so'rovlar soni va vaqtini turli miqdordagi kurslarga yozilgan foydalanuvchida o'lchash"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enrolments', type=int, nargs='+', default=[1, 10, 50, 200],
+                            help='Foydalanuvchi yozilgan kurslar soni')
+        parser.add_argument('--modules', type=int, default=8, help='Har bir kursdagi modullar soni')
+        parser.add_argument('--repeat', type=int, default=20, help='Necha marta o\'lchanadi')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+
+        self.stdout.write("{:>8} {:>10} {:>12}".format('kurslar', "so'rovlar", "o'rtacha ms"))
+        for enrolments in options['enrolments']:
+            # Vaqtinchalik ma'lumotlar tranzaksiya oxirida bekor qilinadi
+            with transaction.atomic():
+                user = self._seed(enrolments, options['modules'])
+
+                def render_profile():
+                    request = factory.get('/profile/')
+                    request.user = user
+                    SessionMiddleware(lambda r: None).process_request(request)
+                    request._messages = FallbackStorage(request)
+                    return profile_view(request)
+
+                with CaptureQueriesContext(connection) as queries:
+                    render_profile()
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    render_profile()
+                elapsed = (time.perf_counter() - start) * 1000 / options['repeat']
+
+                transaction.set_rollback(True)
+
+            self.stdout.write(f"{enrolments:>8} {len(queries):>10} {elapsed:>12.2f}")
+
+    def _seed(self, enrolments, module_count):
+        user = get_user_model().objects.create_user(
+            username='benchmark_profile', email='benchmark_profile@example.com', password=None
+        )
+        # bulk_create signal yubormaydi, modullar shu yerda yaratiladi
+        courses = Course.objects.bulk_create(
+            [Course(name=f'Benchmark kurs {i}', module_count=module_count) for i in range(enrolments)]
+        )
+        modules = Module.objects.bulk_create(
+            [Module(course=c, number=n, name=f'Modul {n}', description='') for c in courses for n in range(1, module_count + 1)]
+        )
+        completed = module_count // 2
+        UserModuleProgress.objects.bulk_create(
+            [UserModuleProgress(user=user, module=m, is_completed=True) for m in modules if m.number <= completed]
+        )
+        # Profil hisoblagichlarni o'qiydi - ular haqiqiy modullar soniga mos to'ldiriladi
+        UserCourseProgress.objects.bulk_create([
+            UserCourseProgress(user=user, course=c, total_modules=module_count, completed_modules=completed)
+            for c in courses
+        ])
+        return user
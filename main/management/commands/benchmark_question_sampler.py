@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import TestSet, Question, Answer
+from main.question_sampler import sample_questions, invalidate_question_ids
+
+
+class Command(BaseCommand):
+    help = "order_by('?') va sample_questions() ni 1k/10k/100k savollik banklarda solishtirish"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Savollar banki o\'lchamlari')
+        parser.add_argument('--k', type=int, default=20, help='Tanlanadigan savollar soni')
+        parser.add_argument('--repeat', type=int, default=20, help='Har bir usul necha marta o\'lchanadi')
+
+    def handle(self, *args, **options):
+        k = options['k']
+        repeat = options['repeat']
+
+        self.stdout.write(f"{'savollar':>10} {'order_by(?) ms':>16} {'sampler sovuq ms':>18} {'sampler issiq ms':>18}")
+        for size in options['sizes']:
+            # Vaqtinchalik ma'lumotlar tranzaksiya oxirida bekor qilinadi
+            with transaction.atomic():
+                test_set = self._seed(size)
+
+                random_sort = self._measure(repeat, lambda: list(
+                    Question.objects.filter(test_set=test_set).prefetch_related('answers').order_by('?')[:k]
+                ))
+
+                def cold():
+                    invalidate_question_ids(test_set.id)
+                    return sample_questions(test_set.id, k)
+                sampler_cold = self._measure(repeat, cold)
+
+                sample_questions(test_set.id, k)
+                sampler_warm = self._measure(repeat, lambda: sample_questions(test_set.id, k))
+
+                invalidate_question_ids(test_set.id)
+                transaction.set_rollback(True)
+
+            self.stdout.write(f"{size:>10} {random_sort:>16.2f} {sampler_cold:>18.2f} {sampler_warm:>18.2f}")
+
+    def _seed(self, size):
+        test_set = TestSet.objects.create(name=f'Benchmark ({size})')
+        questions = Question.objects.bulk_create(
+            [Question(test_set=test_set, number=i, text=f'Savol {i}') for i in range(1, size + 1)],
+            batch_size=5000,
+        )
+        Answer.objects.bulk_create(
+            [Answer(question=q, text=f'Variant {j}', is_correct=(j == 0)) for q in questions for j in range(4)],
+            batch_size=5000,
+        )
+        return test_set
+
+    def _measure(self, repeat, func):
+        """O'rtacha bajarilish vaqti (millisekundlarda)"""
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
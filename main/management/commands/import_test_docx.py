@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.docx_parser import parse_docx_test, save_questions_from_docx
+from main.models import TestSet
+
+
+class Command(BaseCommand):
+    help = (
+        "DOCX fayldagi savollarni test to'plamiga yuklash (## 1-savol / A) ... / Javob: A formatida). "
+        "Faylda xato bo'lsa, qator raqamlari bilan chiqariladi va hech narsa yozilmaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('test_set', type=int, help='Test to\'plami ID si')
+        parser.add_argument('path', help='DOCX fayl yo\'li')
+        parser.add_argument('--append', action='store_true',
+                            help='Mavjud savollarni o\'chirmasdan qo\'shish (raqamlar takrorlanmasligi kerak)')
+        parser.add_argument('--dry-run', action='store_true', help='Faqat faylni tekshirish')
+
+    def handle(self, *args, **options):
+        try:
+            test_set = TestSet.objects.get(pk=options['test_set'])
+        except TestSet.DoesNotExist:
+            raise CommandError(f"{options['test_set']} ID li test to'plami topilmadi")
+
+        with open(options['path'], 'rb') as docx_file:
+            if options['dry_run']:
+                report = parse_docx_test(docx_file)
+            else:
+                report = save_questions_from_docx(test_set, docx_file, replace=not options['append'])
+
+        for issue in report.errors:
+            self.stderr.write(f"{issue.line}-qator: {issue.message}" if issue.line else issue.message)
+        if not report.ok:
+            raise CommandError(report.message)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Fayl to'g'ri: {len(report.questions)} ta savol"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{test_set}: {report.message} ({report.deleted} ta eski savol o'chirildi)"))
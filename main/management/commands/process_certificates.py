@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from main.certificate_queue import claim_next_job, process_job, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Sertifikat navbatidagi vazifalarni bajaruvchi worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2,
+                            help='Bir vaqtda ishlaydigan workerlar soni')
+        parser.add_argument('--max-retries', type=int, default=3,
+                            help='Vazifa uchun maksimal urinishlar soni')
+        parser.add_argument('--poll-interval', type=float, default=5,
+                            help='Navbat bo\'sh bo\'lganda kutish vaqti (soniyalarda)')
+        parser.add_argument('--once', action='store_true',
+                            help='Navbatni bo\'shatib, chiqib ketish')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"{requeued} ta to'xtab qolgan vazifa navbatga qaytarildi")
+
+        self._stop = threading.Event()
+        self._requeue_lock = threading.Lock()
+        self._requeue_interval = options['poll_interval']
+        self._last_requeue = time.monotonic()
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(f"Sertifikat worker ishga tushdi (concurrency={concurrency})")
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(self._work, options['max_retries'], options['poll_interval'], options['once'])
+                for _ in range(concurrency)
+            ]
+            try:
+                done = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                # Joriy vazifalar tugagach workerlar to'xtaydi
+                self._stop.set()
+                self.stdout.write("Worker to'xtatilmoqda...")
+                return
+
+        self.stdout.write(self.style.SUCCESS(f"{done} ta sertifikat tayyorlandi"))
+
+    def _work(self, max_retries, poll_interval, once):
+        done = 0
+        try:
+            while not self._stop.is_set():
+                self._requeue_stale()
+                job = claim_next_job()
+                if job is None:
+                    if once:
+                        break
+                    self._stop.wait(poll_interval)
+                    continue
+
+                if process_job(job, max_retries=max_retries):
+                    done += 1
+                    self.stdout.write(f"Sertifikat tayyor: {job.user_id}/{job.course_id}")
+                else:
+                    self.stderr.write(f"Sertifikat xatoligi: vazifa #{job.pk}")
+            return done
+        finally:
+            connection.close()
+
+    def _requeue_stale(self):
+        """
+        Ishlash davomida o'lgan worker qoldirgan vazifalarni qaytarish.
+
+        Workerlar orasida poll_interval da ko'pi bilan bir marta bajariladi.
+        """
+        with self._requeue_lock:
+            if time.monotonic() - self._last_requeue < self._requeue_interval:
+                return
+            self._last_requeue = time.monotonic()
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"{requeued} ta to'xtab qolgan vazifa navbatga qaytarildi")
@@ -0,0 +1,24 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.search import SEARCH_TEXT_MODELS, update_search_columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Qidiruv uchun search_text (va PostgreSQL da search_vector) ustunlarini qayta hisoblash. Signal "
+        "ishlamaydigan o'zgarishlardan (queryset.update(), bulk_create, to'g'ridan-to'g'ri SQL) yoki "
+        "normallashtirish qoidalari (main/uzbek_text.py) o'zgargandan keyin ishga tushiriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=SEARCH_TEXT_MODELS,
+                            help='Faqat shu model(lar) (bir necha marta berish mumkin)')
+
+    def handle(self, *args, **options):
+        for model_name in options['models'] or SEARCH_TEXT_MODELS:
+            with transaction.atomic():
+                updated = update_search_columns(apps.get_model('main', model_name))
+            self.stdout.write(f"{model_name}: {updated} ta yozuv")
+        self.stdout.write(self.style.SUCCESS("Qidiruv indeksi yangilandi"))
@@ -0,0 +1,132 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+import django
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from main.certificate_generator import generate_certificate, TEMPLATE_VERSION
+from main.models import Certificate
+
+
+def _render_certificate(args):
+    """Worker jarayonida PDF yaratish (bazaga murojaat qilmaydi)"""
+    user, course, test_result = args
+    return generate_certificate(user, course, test_result).getvalue()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mavjud sertifikat fayllarini joriy shablon bilan qayta yaratish. "
+        "Faqat eski shablon versiyasidagi sertifikatlar olinadi, shuning uchun "
+        "to'xtatilgan buyruqni qayta ishga tushirish kifoya."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help='Faqat shu kurs(lar) sertifikatlari (bir necha marta berish mumkin)')
+        parser.add_argument('--since', help='Berilgan sanadan boshlab (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Berilgan sanagacha, shu kun ham kiradi (YYYY-MM-DD)')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='PDF yaratuvchi jarayonlar soni')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Bir vaqtda ishlanadigan sertifikatlar soni')
+        parser.add_argument('--force', action='store_true',
+                            help='Shablon versiyasidan qat\'i nazar barchasini qayta yaratish')
+        parser.add_argument('--start-id', type=int, default=0,
+                            help='Shu ID dan keyingi sertifikatlardan boshlash (--force bilan davom ettirish uchun)')
+
+    def handle(self, *args, **options):
+        queryset = Certificate.objects.select_related('user', 'course', 'test_result').order_by('pk')
+        if not options['force']:
+            queryset = queryset.filter(template_version__lt=TEMPLATE_VERSION)
+        if options['start_id']:
+            queryset = queryset.filter(pk__gt=options['start_id'])
+        if options['courses']:
+            queryset = queryset.filter(course_id__in=options['courses'])
+        if options['since']:
+            queryset = queryset.filter(issued_at__date__gte=self._parse_date(options['since']))
+        if options['until']:
+            queryset = queryset.filter(issued_at__date__lte=self._parse_date(options['until']))
+
+        total = queryset.count()
+        if not total:
+            self.stdout.write("Qayta yaratiladigan sertifikat yo'q")
+            return
+        self.stdout.write(f"{total} ta sertifikat qayta yaratiladi (shablon v{TEMPLATE_VERSION})")
+
+        # Worker jarayonlar ota jarayonning baza ulanishlarini meros qilib olmasligi kerak
+        connections.close_all()
+
+        processed = failed = 0
+        last_id = None
+        start = time.perf_counter()
+        batch_size = max(1, options['batch_size'])
+
+        with ProcessPoolExecutor(
+            max_workers=max(1, options['workers']),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        ) as executor:
+            # iterator() PostgreSQL da server-side cursor orqali o'qiydi
+            rows = queryset.iterator(chunk_size=batch_size)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+
+                futures = [
+                    executor.submit(_render_certificate, (c.user, c.course, c.test_result))
+                    for c in batch
+                ]
+                for certificate, future in zip(batch, futures):
+                    try:
+                        self._store(certificate, future.result())
+                        processed += 1
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f"Sertifikat #{certificate.pk}: {e}")
+                    last_id = certificate.pk
+
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{processed + failed}/{total} (oxirgi ID: {last_id}) - "
+                    f"{processed / elapsed:.1f} sertifikat/s"
+                )
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {processed} ta qayta yaratildi, {failed} ta xatolik, "
+            f"{elapsed:.1f} s ({processed / elapsed:.1f} sertifikat/s)"
+        ))
+
+    def _store(self, certificate, pdf_bytes):
+        """
+        Yangi faylni alohida nom bilan yozib, so'ng yozuvni unga o'tkazish.
+
+        O'quvchilar har doim yo eski, yo yangi to'liq faylni ko'radi; eski fayl
+        faqat yozuv yangilangandan keyin o'chiriladi.
+        """
+        old_name = certificate.certificate_file.name
+        storage = certificate.certificate_file.storage
+        new_name = storage.save(
+            f'certificates/certificate_{certificate.user_id}_{certificate.course_id}_'
+            f'{timezone.now().strftime("%Y%m%d%H%M%S")}.pdf',
+            ContentFile(pdf_bytes)
+        )
+        Certificate.objects.filter(pk=certificate.pk).update(
+            certificate_file=new_name, template_version=TEMPLATE_VERSION
+        )
+        if old_name and old_name != new_name:
+            storage.delete(old_name)
+
+    def _parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Noto'g'ri sana: {value} (YYYY-MM-DD formatida kiriting)")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from main.course_progress import recount_course_progress
+from main.models import UserCourseProgress
+
+
+class Command(BaseCommand):
+    help = (
+        "UserCourseProgress dagi completed_modules/total_modules hisoblagichlarini "
+        "UserModuleProgress va Module jadvallaridan qayta hisoblash (faqat farq qilganlari yangilanadi)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, action='append', dest='courses',
+                            help='Faqat shu kurs(lar) (bir necha marta berish mumkin)')
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Faqat shu foydalanuvchi(lar) ID si')
+
+    def handle(self, *args, **options):
+        queryset = UserCourseProgress.objects.all()
+        if options['courses']:
+            queryset = queryset.filter(course_id__in=options['courses'])
+        if options['users']:
+            queryset = queryset.filter(user_id__in=options['users'])
+
+        repaired = recount_course_progress(queryset)
+        self.stdout.write(self.style.SUCCESS(f"{repaired} ta progress yozuvi tuzatildi"))
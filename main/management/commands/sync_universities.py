@@ -0,0 +1,121 @@
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from main.models import University
+from main.universities import UNIVERSITY_API_URL
+
+
+class Command(BaseCommand):
+    help = (
+        "OTMlar ro'yxatini prof-emis.edu.uz API dan olib, universities jadvalini "
+        "yangilash. API ishlamasa yoki shubhali javob qaytarsa, jadvaldagi oxirgi "
+        "to'g'ri ro'yxat o'zgarishsiz qoladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=UNIVERSITY_API_URL, help='API manzili')
+        parser.add_argument('--timeout', type=float, default=30, help='So\'rov uchun kutish vaqti (soniyalarda)')
+        parser.add_argument('--min-ratio', type=float, default=0.5,
+                            help='Yangi ro\'yxat joriy faol OTMlar sonining shu ulushidan kam bo\'lsa, sinxronlash bekor qilinadi')
+        parser.add_argument('--force', action='store_true', help='--min-ratio tekshiruvini o\'tkazib yuborish')
+
+    def handle(self, *args, **options):
+        fetched = self._fetch(options['url'], options['timeout'])
+
+        active_count = University.objects.filter(is_active=True).count()
+        if not options['force'] and active_count and len(fetched) < active_count * options['min_ratio']:
+            raise CommandError(
+                f"API faqat {len(fetched)} ta OTM qaytardi (jadvalda {active_count} ta faol). "
+                "Oxirgi ro'yxat saqlab qolindi; --force bilan majburan yangilash mumkin."
+            )
+
+        created, updated, deactivated = self._apply(fetched)
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: {created} ta yangi, {updated} ta yangilandi, {deactivated} ta nofaol qilindi "
+            f"(jami {len(fetched)} ta)"
+        ))
+
+    def _fetch(self, url, timeout):
+        """API javobidan {nom: tashqi_id} lug'atini olish"""
+        try:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise CommandError(f"API dan OTM ma'lumotlarini olishda xatolik: {e}. Oxirgi ro'yxat saqlab qolindi.")
+
+        # API to'g'ridan-to'g'ri list qaytaradi
+        if not isinstance(data, list):
+            raise CommandError("API kutilmagan formatda javob qaytardi. Oxirgi ro'yxat saqlab qolindi.")
+
+        fetched = {}
+        seen_ids = set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            # name_uz, name_en, name_ru kalitlaridan birini olish
+            name = (item.get('name_uz') or item.get('name_en') or item.get('name_ru') or '').strip()
+            if name and name not in fetched:
+                external_id = str(item['id']) if item.get('id') is not None else None
+                if external_id in seen_ids:
+                    external_id = None
+                seen_ids.add(external_id)
+                fetched[name[:300]] = external_id
+
+        if not fetched:
+            raise CommandError("API bo'sh ro'yxat qaytardi. Oxirgi ro'yxat saqlab qolindi.")
+        return fetched
+
+    @transaction.atomic
+    def _apply(self, fetched):
+        """
+        Jadvalni API ro'yxatiga moslashtirish: yangilarini qo'shish, nomi
+        o'zgarganlarini yangilash, ro'yxatda yo'qlarini nofaol qilish.
+        """
+        now = timezone.now()
+        existing = list(University.objects.select_for_update())
+        by_external_id = {u.external_id: u for u in existing if u.external_id}
+        by_name = {u.name: u for u in existing}
+
+        matched = {}
+        to_create = []
+        for name, external_id in fetched.items():
+            university = by_external_id.get(external_id) if external_id else None
+            if university is None or university.pk in matched:
+                university = by_name.get(name)
+            if university is None or university.pk in matched:
+                to_create.append(University(name=name, external_id=external_id, synced_at=now))
+            else:
+                matched[university.pk] = (university, name, external_id)
+
+        to_update = []
+        for university, name, external_id in matched.values():
+            if (university.name, university.external_id, university.is_active) != (name, external_id, True):
+                university.name, university.external_id, university.is_active = name, external_id, True
+                to_update.append(university)
+
+        # Ro'yxatda yo'q, lekin nomi yoki ID si yangi yozuvlarga kerak bo'lgan eski yozuvlar o'chiriladi
+        # (User.university oddiy matn, shuning uchun hech narsa yo'qolmaydi)
+        taken_names = {u.name for u in to_update} | {u.name for u in to_create}
+        taken_ids = {u.external_id for u in to_update + to_create if u.external_id}
+        unmatched = [u for u in existing if u.pk not in matched]
+        University.objects.filter(
+            pk__in=[u.pk for u in unmatched if u.name in taken_names or u.external_id in taken_ids]
+        ).delete()
+        deactivated = University.objects.filter(
+            pk__in=[u.pk for u in unmatched], is_active=True
+        ).update(is_active=False, synced_at=now, updated_at=now)
+
+        if to_update:
+            # Nomlar o'zaro almashgan bo'lsa unique cheklov buzilmasligi uchun avval vaqtinchalik qiymatlar
+            for university in to_update:
+                University.objects.filter(pk=university.pk).update(
+                    name=f'__sync__{university.pk}', external_id=None
+                )
+            University.objects.bulk_update(to_update, ['name', 'external_id', 'is_active'])
+        University.objects.filter(pk__in=list(matched)).update(synced_at=now, updated_at=now)
+        University.objects.bulk_create(to_create)
+
+        return len(to_create), len(to_update), deactivated
@@ -0,0 +1,128 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _parse_range(header, size):
+    """
+    Bitta "bytes=start-end" oralig'ini (start, end) ko'rinishida qaytaradi.
+
+    Sarlavha yo'q yoki bir nechta oraliq so'ralgan bo'lsa - None (butun fayl),
+    oraliq fayldan tashqarida bo'lsa - False (416).
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # "bytes=-500" - oxirgi 500 bayt
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_protected_file(request, fieldfile, filename=None, as_attachment=False, content_type=None):
+    """
+    Ruxsati tekshirilgan faylni foydalanuvchiga berish.
+
+    Ruxsat (login, egalik) chaqiruvchi view da tekshiriladi. Agar
+    PROTECTED_MEDIA_SERVER sozlangan bo'lsa, baytlarni uzatish nginx
+    (X-Accel-Redirect) yoki Apache (X-Sendfile) ga topshiriladi; aks holda
+    Django faylni ETag, Last-Modified va Range (206) qo'llab-quvvatlagan
+    holda o'zi oqim bilan beradi.
+    """
+    if not fieldfile:
+        raise Http404("Fayl topilmadi")
+
+    path = fieldfile.path
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("Fayl topilmadi")
+
+    filename = filename or os.path.basename(fieldfile.name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    disposition = content_disposition_header(as_attachment, filename)
+
+    server = getattr(settings, 'PROTECTED_MEDIA_SERVER', None)
+    if server == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.PROTECTED_MEDIA_INTERNAL_URL + quote(fieldfile.name)
+    elif server == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    else:
+        response = _stream_file(request, path, stat, content_type)
+
+    if disposition:
+        response['Content-Disposition'] = disposition
+    response['Cache-Control'] = 'private'
+    return response
+
+
+def _stream_file(request, path, stat, content_type):
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = f'"{last_modified:x}-{size:x}"'
+
+    # If-None-Match / If-Modified-Since -> 304
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    byte_range = _parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range not in (etag, http_date(last_modified)):
+        # Fayl o'zgargan - butun faylni qaytaramiz
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_iter_range(path, start, length), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    else:
+        # FileResponse wsgi.file_wrapper (sendfile) dan foydalanadi
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
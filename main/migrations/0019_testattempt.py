@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_alter_olympiad_options_remove_olympiad_hero_image_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_ids', models.JSONField(default=list, verbose_name='Berilgan savollar')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Boshlangan vaqt')),
+                ('deadline', models.DateTimeField(verbose_name='Topshirish muddati')),
+                ('submitted_at', models.DateTimeField(blank=True, null=True, verbose_name='Topshirilgan vaqt')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_attempts', to='main.course', verbose_name='Kurs')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_attempts', to=settings.AUTH_USER_MODEL, verbose_name='Foydalanuvchi')),
+            ],
+            options={
+                'verbose_name': 'Test urinishi',
+                'verbose_name_plural': 'Test urinishlari',
+                'db_table': 'test_attempts',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
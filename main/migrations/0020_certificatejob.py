@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_testattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CertificateJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Navbatda'), ('processing', 'Tayyorlanmoqda'), ('done', 'Tayyor'), ('failed', 'Xatolik')], default='pending', max_length=20, verbose_name='Holat')),
+                ('attempts', models.IntegerField(default=0, verbose_name='Urinishlar soni')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Oxirgi xatolik')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Bajarish vaqti')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_jobs', to='main.course', verbose_name='Kurs')),
+                ('test_result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_job', to='main.usertestresult', verbose_name='Test natijasi')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Foydalanuvchi')),
+            ],
+            options={
+                'verbose_name': 'Sertifikat navbati',
+                'verbose_name_plural': 'Sertifikat navbati',
+                'db_table': 'certificate_jobs',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='cert_job_status_run_after')],
+            },
+        ),
+    ]
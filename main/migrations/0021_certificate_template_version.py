@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_certificatejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='template_version',
+            field=models.PositiveIntegerField(default=0, help_text='Fayl qaysi sertifikat shabloni bilan yaratilgan', verbose_name='Shablon versiyasi'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0021_certificate_template_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_certificate',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/avatars/', verbose_name='Sertifikat uchun avatar'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_small',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='profiles/avatars/', verbose_name='Kichik avatar'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 12:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0022_user_avatar_derivatives'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='University',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.CharField(blank=True, max_length=50, null=True, unique=True, verbose_name='Tashqi ID')),
+                ('name', models.CharField(max_length=300, unique=True, verbose_name='Nomi')),
+                ('is_active', models.BooleanField(default=True, help_text="API ro'yxatida bo'lmagan OTMlar nofaol qilinadi", verbose_name='Faol')),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Oxirgi sinxronlash')),
+            ],
+            options={
+                'verbose_name': 'OTM',
+                'verbose_name_plural': 'OTMlar',
+                'db_table': 'universities',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_module_counters(apps, schema_editor):
+    Module = apps.get_model('main', 'Module')
+    UserCourseProgress = apps.get_model('main', 'UserCourseProgress')
+    UserModuleProgress = apps.get_model('main', 'UserModuleProgress')
+
+    total = Module.objects.filter(
+        course=OuterRef('course')
+    ).order_by().values('course').annotate(c=Count('pk')).values('c')
+    completed = UserModuleProgress.objects.filter(
+        user=OuterRef('user'), module__course=OuterRef('course'), is_completed=True
+    ).order_by().values('module__course').annotate(c=Count('pk')).values('c')
+    UserCourseProgress.objects.update(
+        total_modules=Coalesce(Subquery(total, output_field=IntegerField()), 0),
+        completed_modules=Coalesce(Subquery(completed, output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0023_university'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercourseprogress',
+            name='completed_modules',
+            field=models.PositiveIntegerField(default=0, verbose_name='Tugatilgan modullar'),
+        ),
+        migrations.AddField(
+            model_name='usercourseprogress',
+            name='total_modules',
+            field=models.PositiveIntegerField(default=0, verbose_name='Jami modullar'),
+        ),
+        migrations.RunPython(fill_module_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0024_usercourseprogress_module_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='buxduolympiad',
+            index=models.Index(fields=['date', 'id'], name='buxdu_olympiad_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='olympiad',
+            index=models.Index(fields=['date', 'id'], name='olympiad_date_id'),
+        ),
+    ]
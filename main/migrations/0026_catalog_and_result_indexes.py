@@ -0,0 +1,74 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('main', '0025_olympiad_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='articlebank',
+            index=models.Index(fields=['created_at', 'id'], name='article_bank_created'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmenttest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='assessment_active_created'),
+        ),
+        migrations.AddIndex(
+            model_name='assessmenttestresult',
+            index=models.Index(fields=['user', 'assessment_test', 'submitted_at'], name='assessment_result_user_test'),
+        ),
+        migrations.AddIndex(
+            model_name='buxduolympiadwinner',
+            index=models.Index(fields=['created_at', 'id'], name='buxdu_winner_created'),
+        ),
+        migrations.AddIndex(
+            model_name='buxduscholarship',
+            index=models.Index(fields=['created_at', 'id'], name='buxdu_scholarship_created'),
+        ),
+        migrations.AddIndex(
+            model_name='buxduwinnerdatabase',
+            index=models.Index(fields=['academic_year', 'id'], name='buxdu_winner_db_year'),
+        ),
+        migrations.AddIndex(
+            model_name='conference',
+            index=models.Index(fields=['type', 'created_at', 'id'], name='conference_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='course_active_created'),
+        ),
+        migrations.AddIndex(
+            model_name='dissertationbank',
+            index=models.Index(fields=['created_at', 'id'], name='dissertation_created'),
+        ),
+        migrations.AddIndex(
+            model_name='oakdatabase',
+            index=models.Index(fields=['type', 'created_at', 'id'], name='oak_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='olympiad',
+            index=models.Index(fields=['type', 'created_at', 'id'], name='olympiad_type_created'),
+        ),
+        migrations.AddIndex(
+            model_name='researcherregulation',
+            index=models.Index(fields=['created_at', 'id'], name='regulation_created'),
+        ),
+        migrations.AddIndex(
+            model_name='statescholarship',
+            index=models.Index(fields=['created_at', 'id'], name='state_scholarship_created'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['status', 'created_at'], name='user_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='usertestresult',
+            index=models.Index(fields=['user', 'course', 'passed', 'submitted_at'], name='test_result_user_course'),
+        ),
+    ]
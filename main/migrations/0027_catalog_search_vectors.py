@@ -0,0 +1,105 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:40
+
+from functools import reduce
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+# Migratsiya paytidagi holat (keyingi o'zgarishlar main/search.py da)
+SEARCH_FIELDS = {
+    'Olympiad': (('name', 'A'), ('subject', 'B'), ('country', 'C'), ('short_description', 'D')),
+    'OakDatabase': (('journal_name', 'A'), ('fields', 'B')),
+    'Conference': (('name', 'A'),),
+    'DissertationBank': (('direction', 'A'), ('database_type', 'B')),
+    'ArticleBank': (('name', 'A'), ('short_guide', 'C')),
+    'ResearcherRegulation': (('regulation_name', 'A'),),
+    'Announcement': (('title', 'A'), ('short_text', 'B'), ('detailed_text', 'D')),
+}
+
+
+def fill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, fields in SEARCH_FIELDS.items():
+        vector = reduce(lambda a, b: a + b, [
+            SearchVector(field, weight=weight, config='simple') for field, weight in fields
+        ])
+        apps.get_model('main', model_name).objects.update(search_vector=vector)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_catalog_and_result_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='announcement',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='articlebank',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='dissertationbank',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='oakdatabase',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='olympiad',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='researcherregulation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='announcement_search'),
+        ),
+        migrations.AddIndex(
+            model_name='articlebank',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='article_bank_search'),
+        ),
+        migrations.AddIndex(
+            model_name='conference',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='conference_search'),
+        ),
+        migrations.AddIndex(
+            model_name='dissertationbank',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dissertation_search'),
+        ),
+        migrations.AddIndex(
+            model_name='oakdatabase',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='oak_search'),
+        ),
+        migrations.AddIndex(
+            model_name='olympiad',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='olympiad_search'),
+        ),
+        migrations.AddIndex(
+            model_name='researcherregulation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='regulation_search'),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
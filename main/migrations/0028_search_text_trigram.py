@@ -0,0 +1,159 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:05
+
+import re
+import unicodedata
+from functools import reduce
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import TextField, Value
+
+
+
+# main/uzbek_text.py dagi normalize_uzbek_text ning migratsiya paytidagi nusxasi -
+# keyinchalik funksiya o'zgarsa ham bu migratsiya natijasi o'zgarmasligi uchun
+_APOSTROPHES = "'`´ʻʼʹʽ‘’′"
+_CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j', 'з': 'z',
+    'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r',
+    'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh',
+    'ъ': "'", 'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+    'ў': "o'", 'қ': 'q', 'ғ': "g'", 'ҳ': 'h',
+}
+_TURKIC_TO_UZBEK = {'ğ': "g'", 'ş': 'sh', 'ç': 'ch', 'ö': "o'"}
+_TRANSLATION = str.maketrans({
+    **{char: "'" for char in _APOSTROPHES},
+    **_CYRILLIC_TO_LATIN,
+    **_TURKIC_TO_UZBEK,
+})
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_uzbek_text(text):
+    text = unicodedata.normalize('NFC', text or '').casefold().translate(_TRANSLATION)
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+# Migratsiya paytidagi holat (keyingi o'zgarishlar main/search.py da)
+SEARCH_FIELDS = {
+    'Olympiad': (('name', 'A'), ('subject', 'B'), ('country', 'C'), ('short_description', 'D')),
+    'OakDatabase': (('journal_name', 'A'), ('fields', 'B')),
+    'Conference': (('name', 'A'),),
+    'DissertationBank': (('direction', 'A'), ('database_type', 'B')),
+    'ArticleBank': (('name', 'A'), ('short_guide', 'C')),
+    'ResearcherRegulation': (('regulation_name', 'A'),),
+    'Announcement': (('title', 'A'), ('short_text', 'B'), ('detailed_text', 'D')),
+    'User': (('username', None), ('email', None), ('first_name', None), ('last_name', None), ('university', None)),
+}
+
+
+def fill_search_text(apps, schema_editor):
+    """search_text ni to'ldirish; PostgreSQL da search_vector ham normallashtirilgan matndan qayta quriladi"""
+    postgresql = schema_editor.connection.vendor == 'postgresql'
+    for model_name, fields in SEARCH_FIELDS.items():
+        manager = apps.get_model('main', model_name)._base_manager
+        with_vector = postgresql and model_name != 'User'
+        update_fields = ['search_text', 'search_vector'] if with_vector else ['search_text']
+        batch = []
+        for obj in manager.only(*(field for field, _ in fields)).order_by('pk').iterator(chunk_size=500):
+            texts = [(normalize_uzbek_text(getattr(obj, field)), weight) for field, weight in fields]
+            obj.search_text = ' '.join(text for text, _ in texts if text)
+            if with_vector:
+                obj.search_vector = reduce(lambda a, b: a + b, [
+                    SearchVector(Value(text, output_field=TextField()), weight=weight, config='simple')
+                    for text, weight in texts
+                ])
+            batch.append(obj)
+            if len(batch) == 500:
+                manager.bulk_update(batch, update_fields)
+                batch = []
+        if batch:
+            manager.bulk_update(batch, update_fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('main', '0027_catalog_search_vectors'),
+    ]
+
+    operations = [
+        # PostgreSQL bo'lmagan bazalarda hech narsa qilmaydi
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='announcement',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='articlebank',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='conference',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='dissertationbank',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='oakdatabase',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='olympiad',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='researcherregulation',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='announcement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='announcement_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='articlebank',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='article_bank_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='conference',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='conference_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='dissertationbank',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='dissertation_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='oakdatabase',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='oak_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='olympiad',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='olympiad_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='researcherregulation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='regulation_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='user_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    """Cheklov qo'shilishidan oldin bir (user, course) uchun bittadan ortiq faol vazifani to'xtatish"""
+    CertificateJob = apps.get_model('main', 'CertificateJob')
+    seen = set()
+    duplicates = []
+    active = CertificateJob.objects.filter(status__in=['pending', 'processing']).order_by('-created_at', '-id')
+    for job_id, user_id, course_id in active.values_list('id', 'user_id', 'course_id'):
+        if (user_id, course_id) in seen:
+            duplicates.append(job_id)
+        seen.add((user_id, course_id))
+    CertificateJob.objects.filter(pk__in=duplicates).update(
+        status='failed', last_error='Takroriy vazifa (cert_job_one_active)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0028_search_text_trigram'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='certificatejob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'processing'])), fields=('user', 'course'), name='cert_job_one_active'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0029_certificatejob_one_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='university',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 
 # 1. Foydalanuvchi (Custom User)
@@ -19,6 +22,9 @@ class User(AbstractUser):
     academic_degree = models.CharField(max_length=20, choices=DEGREE_CHOICES, blank=True, default='', verbose_name='Ilmiy daraja')
     status = models.CharField(max_length=50, default='talaba', verbose_name='Status')
     profile_image = models.ImageField(upload_to='profiles/', blank=True, null=True, verbose_name='Profil rasmi')
+    # Profil rasmidan yuklanganda yaratiladigan hosilalar (main/avatars.py)
+    avatar_small = models.ImageField(upload_to='profiles/avatars/', blank=True, null=True, editable=False, verbose_name='Kichik avatar')
+    avatar_certificate = models.ImageField(upload_to='profiles/avatars/', blank=True, null=True, editable=False, verbose_name='Sertifikat uchun avatar')
     
     # Saralash testi (Assessment Test) ma'lumotlari
     assessment_score = models.FloatField(default=0, verbose_name='Saralash testi natijasi (%)')
@@ -28,6 +34,9 @@ class User(AbstractUser):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Qidiruv uchun normallashtirilgan matn (main/uzbek_text.py, signal orqali yangilanadi);
+    # pg_trgm indeksi qism-satr va o'xshash so'z qidiruvini indeks orqali bajaradi
+    search_text = models.TextField(default='', editable=False)
     
     groups = models.ManyToManyField(
         'auth.Group',
@@ -51,6 +60,10 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'Foydalanuvchi'
         verbose_name_plural = 'Foydalanuvchilar'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='user_status_created'),
+            GinIndex(fields=['search_text'], name='user_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name}" if self.first_name else self.email
@@ -67,12 +80,19 @@ class Announcement(models.Model):
     image_url = models.URLField(blank=True, null=True, verbose_name='Rasm URL', help_text='Yoki rasm URL manzilini kiriting')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Qidiruv vektori (main/search.py, signal orqali yangilanadi)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
 
     class Meta:
         db_table = 'announcements'
         verbose_name = "E'lon"
         verbose_name_plural = "E'lonlar"
         ordering = ['-date']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='announcement_search'),
+            GinIndex(fields=['search_text'], name='announcement_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.title
@@ -135,6 +155,9 @@ class StateScholarship(models.Model):
         db_table = 'state_scholarships'
         verbose_name = 'Davlat stipendiyasi'
         verbose_name_plural = 'Davlat stipendiyalari'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='state_scholarship_created'),
+        ]
 
     def __str__(self):
         return self.name
@@ -153,6 +176,9 @@ class BuxduScholarship(models.Model):
         db_table = 'buxdu_scholarships'
         verbose_name = 'BuxDU stipendiyasi'
         verbose_name_plural = 'BuxDU stipendiyalari'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='buxdu_scholarship_created'),
+        ]
 
     def __str__(self):
         return self.name
@@ -172,11 +198,44 @@ class BuxduWinnerDatabase(models.Model):
         verbose_name = 'BuxDU sovrindorlar bazasi'
         verbose_name_plural = 'BuxDU sovrindorlar bazalari'
         ordering = ['-academic_year']
+        indexes = [
+            models.Index(fields=['academic_year', 'id'], name='buxdu_winner_db_year'),
+        ]
 
     def __str__(self):
         return f"{self.scholarship_type} ({self.academic_year})"
 
 
+class DatedEventQuerySet(models.QuerySet):
+    """
+    Sana bo'yicha kutilayotgan/tugagan holat SQL da hisoblanadi.
+
+    upcoming()/finished() date ustuni bo'yicha oraliq so'rovlari (indeksdan
+    foydalanadi), with_status() esa holatni Case/When bilan date_status
+    sifatida qo'shadi - unga ko'ra filtrlash va saralash mumkin.
+    """
+    UPCOMING = 'upcoming'
+    FINISHED = 'finished'
+
+    def upcoming(self, today=None):
+        return self.filter(date__gte=today or timezone.localdate())
+
+    def finished(self, today=None):
+        return self.filter(date__lt=today or timezone.localdate())
+
+    def with_status(self, today=None):
+        return self.annotate(date_status=models.Case(
+            models.When(date__lt=today or timezone.localdate(), then=models.Value(self.FINISHED)),
+            default=models.Value(self.UPCOMING),
+            output_field=models.CharField(),
+        ))
+
+
+class OlympiadQuerySet(DatedEventQuerySet):
+    UPCOMING = 'kutilmoqda'
+    FINISHED = 'tugagan'
+
+
 # 9. Turli olimpiadalar
 class Olympiad(models.Model):
     TYPE_CHOICES = [
@@ -196,31 +255,39 @@ class Olympiad(models.Model):
     registration_link = models.URLField(verbose_name='Ro\'yxatdan o\'tish havolasi', help_text='Olimpiadaga ro\'yxatdan o\'tish uchun havola')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
+
+    objects = OlympiadQuerySet.as_manager()
 
     class Meta:
         db_table = 'olympiads'
         verbose_name = 'Olimpiada'
         verbose_name_plural = 'Olimpiadalar'
         ordering = ['date']
+        indexes = [
+            models.Index(fields=['date', 'id'], name='olympiad_date_id'),
+            models.Index(fields=['type', 'created_at', 'id'], name='olympiad_type_created'),
+            GinIndex(fields=['search_vector'], name='olympiad_search'),
+            GinIndex(fields=['search_text'], name='olympiad_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.subject})"
     
     @property
     def status(self):
-        """Olimpiada statusini sanaga qarab aniqlash"""
-        from datetime import date
-        today = date.today()
-        if self.date >= today:
-            return 'kutilmoqda'
-        else:
-            return 'tugagan'
+        """Olimpiada statusini sanaga qarab aniqlash (with_status() bilan olingan bo'lsa - SQL dagi qiymat)"""
+        if 'date_status' in self.__dict__:
+            return self.date_status
+        if self.date >= timezone.localdate():
+            return OlympiadQuerySet.UPCOMING
+        return OlympiadQuerySet.FINISHED
     
     @property
     def is_upcoming(self):
         """Olimpiada kelgusi yoki yo'qligini tekshirish"""
-        from datetime import date
-        return self.date >= date.today()
+        return self.status == OlympiadQuerySet.UPCOMING
 
 
 # 10. BuxDU olimpiada g'oliblari
@@ -238,6 +305,9 @@ class BuxduOlympiadWinner(models.Model):
         verbose_name = "BuxDU olimpiada g'olibi"
         verbose_name_plural = "BuxDU olimpiada g'oliblari"
         ordering = ['-academic_year']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='buxdu_winner_created'),
+        ]
 
     def __str__(self):
         return f"{self.olympiad_name} - {self.subject} ({self.academic_year})"
@@ -270,24 +340,25 @@ class BuxduOlympiad(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = DatedEventQuerySet.as_manager()
+
     class Meta:
         db_table = 'buxdu_olympiads'
         verbose_name = 'BuxDU olimpiadasi'
         verbose_name_plural = 'BuxDU olimpiadalari'
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['date', 'id'], name='buxdu_olympiad_date_id'),
+        ]
 
     @property
     def status(self):
-        """Olimpiada statusini sanaga qarab avtomatik aniqlash"""
-        if not self.date:
-            return 'upcoming'
-        
-        from django.utils import timezone
-        
-        today = timezone.now().date()
-        if self.date < today:
-            return 'finished'
-        return 'upcoming'
+        """Olimpiada statusini sanaga qarab avtomatik aniqlash (with_status() bilan olingan bo'lsa - SQL dagi qiymat)"""
+        if 'date_status' in self.__dict__:
+            return self.date_status
+        if not self.date or self.date >= timezone.localdate():
+            return DatedEventQuerySet.UPCOMING
+        return DatedEventQuerySet.FINISHED
     
     @property
     def status_display(self):
@@ -354,11 +425,18 @@ class OakDatabase(models.Model):
     editorial_link = models.URLField(verbose_name='Tahririyat havolasi', help_text='Tahririyat sahifasiga havola')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
 
     class Meta:
         db_table = 'oak_database'
         verbose_name = 'OAK bazasi'
         verbose_name_plural = 'OAK bazalari'
+        indexes = [
+            models.Index(fields=['type', 'created_at', 'id'], name='oak_type_created'),
+            GinIndex(fields=['search_vector'], name='oak_search'),
+            GinIndex(fields=['search_text'], name='oak_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.journal_name} ({self.get_type_display()})"
@@ -377,11 +455,18 @@ class Conference(models.Model):
     organizer_link = models.URLField(verbose_name='Tashkilotchi havolasi', help_text='Tashkilotchi tashkilot sahifasiga havola')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
 
     class Meta:
         db_table = 'conferences'
         verbose_name = 'Konferensiya'
         verbose_name_plural = 'Konferensiyalar'
+        indexes = [
+            models.Index(fields=['type', 'created_at', 'id'], name='conference_type_created'),
+            GinIndex(fields=['search_vector'], name='conference_search'),
+            GinIndex(fields=['search_text'], name='conference_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_type_display()})"
@@ -394,11 +479,18 @@ class DissertationBank(models.Model):
     link = models.URLField(verbose_name='Havola', help_text='Dissertatsiya bazasiga havola')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
 
     class Meta:
         db_table = 'dissertation_bank'
         verbose_name = 'Dissertatsiya banki'
         verbose_name_plural = 'Dissertatsiyalar banki'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='dissertation_created'),
+            GinIndex(fields=['search_vector'], name='dissertation_search'),
+            GinIndex(fields=['search_text'], name='dissertation_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return f"{self.database_type} - {self.direction}"
@@ -411,11 +503,18 @@ class ArticleBank(models.Model):
     database_link = models.URLField(verbose_name='Baza havolasi', help_text='Maqolalar bazasiga havola')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
 
     class Meta:
         db_table = 'article_bank'
         verbose_name = 'Maqola banki'
         verbose_name_plural = 'Maqolalar banki'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='article_bank_created'),
+            GinIndex(fields=['search_vector'], name='article_bank_search'),
+            GinIndex(fields=['search_text'], name='article_bank_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.name
@@ -427,11 +526,18 @@ class ResearcherRegulation(models.Model):
     file = models.FileField(upload_to='regulations/', verbose_name='Fayl', help_text='Nizom faylini yuklang (PDF, DOCX)')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', editable=False)
 
     class Meta:
         db_table = 'researcher_regulations'
         verbose_name = 'Tadqiqotchi nizomi'
         verbose_name_plural = 'Tadqiqotchilar nizomlari'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='regulation_created'),
+            GinIndex(fields=['search_vector'], name='regulation_search'),
+            GinIndex(fields=['search_text'], name='regulation_search_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     def __str__(self):
         return self.regulation_name
@@ -456,6 +562,9 @@ class Course(models.Model):
         verbose_name = 'Kurs'
         verbose_name_plural = 'Kurslar'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='course_active_created', condition=models.Q(is_active=True)),
+        ]
 
     def __str__(self):
         return self.name
@@ -545,6 +654,9 @@ class UserCourseProgress(models.Model):
     is_completed = models.BooleanField(default=False, verbose_name='Tugatilgan')
     test_score = models.IntegerField(blank=True, null=True, verbose_name='Test natijasi (foiz)')
     test_passed = models.BooleanField(default=False, verbose_name='Test o\'tdi')
+    # Hisoblagichlar main.course_progress orqali yangilanadi (repair_course_progress buyrug'i tuzatadi)
+    total_modules = models.PositiveIntegerField(default=0, verbose_name='Jami modullar')
+    completed_modules = models.PositiveIntegerField(default=0, verbose_name='Tugatilgan modullar')
 
     class Meta:
         db_table = 'user_course_progress'
@@ -555,6 +667,16 @@ class UserCourseProgress(models.Model):
     def __str__(self):
         return f"{self.user} - {self.course.name}"
 
+    @property
+    def all_modules_completed(self):
+        return self.completed_modules >= self.total_modules
+
+    @property
+    def progress_percentage(self):
+        if not self.total_modules:
+            return 0
+        return int(min(self.completed_modules, self.total_modules) / self.total_modules * 100)
+
 
 # 23. Foydalanuvchi modul progressi
 class UserModuleProgress(models.Model):
@@ -591,16 +713,39 @@ class UserTestResult(models.Model):
         verbose_name = 'Test natijasi'
         verbose_name_plural = 'Test natijalari'
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['user', 'course', 'passed', 'submitted_at'], name='test_result_user_course'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.course.name} - {self.percentage}%"
 
 
+# Test urinishlari (foydalanuvchiga berilgan savollar va muddat)
+class TestAttempt(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='test_attempts', verbose_name='Foydalanuvchi')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='test_attempts', verbose_name='Kurs')
+    question_ids = models.JSONField(default=list, verbose_name='Berilgan savollar')
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='Boshlangan vaqt')
+    deadline = models.DateTimeField(verbose_name='Topshirish muddati')
+    submitted_at = models.DateTimeField(blank=True, null=True, verbose_name='Topshirilgan vaqt')
+
+    class Meta:
+        db_table = 'test_attempts'
+        verbose_name = 'Test urinishi'
+        verbose_name_plural = 'Test urinishlari'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.user} - {self.course.name} ({self.started_at:%d.%m.%Y %H:%M})"
+
+
 class Certificate(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='certificates', verbose_name='Foydalanuvchi')
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='certificates', verbose_name='Kurs')
     test_result = models.OneToOneField(UserTestResult, on_delete=models.CASCADE, related_name='certificate', verbose_name='Test natijasi')
     certificate_file = models.FileField(upload_to='certificates/', verbose_name='Sertifikat fayli')
+    template_version = models.PositiveIntegerField(default=0, verbose_name='Shablon versiyasi', help_text='Fayl qaysi sertifikat shabloni bilan yaratilgan')
     issued_at = models.DateTimeField(auto_now_add=True, verbose_name='Berilgan vaqt')
     
     class Meta:
@@ -613,6 +758,45 @@ class Certificate(models.Model):
         return f"{self.user} - {self.course.name} sertifikati"
 
 
+# Sertifikat yaratish navbati (fon rejimida ishlov beriladi)
+class CertificateJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Navbatda'),
+        ('processing', 'Tayyorlanmoqda'),
+        ('done', 'Tayyor'),
+        ('failed', 'Xatolik'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='certificate_jobs', verbose_name='Foydalanuvchi')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='certificate_jobs', verbose_name='Kurs')
+    test_result = models.OneToOneField(UserTestResult, on_delete=models.CASCADE, related_name='certificate_job', verbose_name='Test natijasi')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name='Holat')
+    attempts = models.IntegerField(default=0, verbose_name='Urinishlar soni')
+    last_error = models.TextField(blank=True, default='', verbose_name='Oxirgi xatolik')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='Bajarish vaqti')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'certificate_jobs'
+        verbose_name = 'Sertifikat navbati'
+        verbose_name_plural = 'Sertifikat navbati'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='cert_job_status_run_after'),
+        ]
+        constraints = [
+            # Bir foydalanuvchi va kurs uchun faqat bitta faol vazifa
+            models.UniqueConstraint(
+                fields=['user', 'course'], condition=models.Q(status__in=['pending', 'processing']),
+                name='cert_job_one_active',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.course.name} ({self.get_status_display()})"
+
+
 # 25. Saralash testi (Assessment Test)
 class AssessmentTest(models.Model):
     title = models.CharField(max_length=255, default='Iqtidorli talabamisiz?', verbose_name='Test nomi', help_text='Saralash testi nomini kiriting')
@@ -630,6 +814,9 @@ class AssessmentTest(models.Model):
         verbose_name = 'Saralash testi'
         verbose_name_plural = 'Saralash testlari'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='assessment_active_created', condition=models.Q(is_active=True)),
+        ]
     
     def __str__(self):
         return self.title
@@ -652,12 +839,27 @@ class AssessmentTestResult(models.Model):
         verbose_name = 'Saralash testi natijasi'
         verbose_name_plural = 'Saralash testi natijalari'
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['user', 'assessment_test', 'submitted_at'], name='assessment_result_user_test'),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.assessment_test.title} - {self.percentage}%"
-        verbose_name_plural = 'Sertifikatlar'
-        ordering = ['-issued_at']
-    
-    def __str__(self):
-        return f"{self.user} - {self.course.name} sertifikati"
 
+
+# 27. OTMlar ma'lumotnomasi (prof-emis.edu.uz dan sync_universities buyrug'i bilan yangilanadi)
+class University(models.Model):
+    external_id = models.CharField(max_length=50, unique=True, null=True, blank=True, verbose_name='Tashqi ID')
+    name = models.CharField(max_length=300, unique=True, verbose_name='Nomi')
+    is_active = models.BooleanField(default=True, verbose_name='Faol', help_text='API ro\'yxatida bo\'lmagan OTMlar nofaol qilinadi')
+    synced_at = models.DateTimeField(default=timezone.now, verbose_name='Oxirgi sinxronlash')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'universities'
+        verbose_name = 'OTM'
+        verbose_name_plural = 'OTMlar'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,202 @@
+import base64
+import binascii
+import datetime
+import json
+from functools import cached_property
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+# Katalog sahifalaridagi bir sahifa hajmi
+CATALOG_PAGE_SIZE = 25
+# Cursor li sahifa fragmentlari muddati: to'g'ri formatdagi istalgan cursor yangi
+# kalit hosil qiladi, shuning uchun ular cache da uzoq saqlanmaydi
+CATALOG_CURSOR_PAGE_TIMEOUT = 60 * 5
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder vaqtni millisekundgacha qisqartiradi - cursor esa aniq bo'lishi kerak
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return DjangoJSONEncoder().default(value)
+
+
+def encode_cursor(values):
+    data = json.dumps(values, default=_cursor_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Cursor dagi qiymatlar ro'yxati; buzilgan cursor uchun None"""
+    if not cursor:
+        return None
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) paginatsiya.
+
+    OFFSET o'rniga oxirgi ko'rsatilgan qator kaliti bo'yicha
+    "(created_at, id) < (...)" sharti ishlatiladi, shuning uchun chuqur
+    sahifalar ham birinchi sahifa kabi indeks bo'yicha o'qiladi. ordering
+    oxirida yagona maydon (id) bo'lishi kerak - aks holda tartib barqaror emas.
+    """
+
+    def __init__(self, queryset, ordering, per_page=CATALOG_PAGE_SIZE):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        opts = queryset.model._meta
+        self.fields = [
+            (opts.pk if name.lstrip('-') == 'pk' else opts.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in self.ordering
+        ]
+
+    def _parse(self, cursor):
+        values = decode_cursor(cursor)
+        if values is None or len(values) != len(self.fields):
+            return None
+        try:
+            return [field.to_python(value) for (field, _), value in zip(self.fields, values)]
+        except (ValidationError, TypeError):
+            return None
+
+    def _seek(self, values, backwards=False):
+        """Tartib bo'yicha values dan keyin (backwards=True - oldin) keladigan qatorlar sharti"""
+        condition = Q()
+        for i, (field, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending != backwards else 'gt'
+            term = Q(**{f'{field.name}__{lookup}': values[i]})
+            for (prev_field, _), prev_value in zip(self.fields[:i], values):
+                term &= Q(**{prev_field.name: prev_value})
+            condition |= term
+        return condition
+
+    def cursor_for(self, obj):
+        return encode_cursor([getattr(obj, field.attname) for field, _ in self.fields])
+
+    def get_page(self, after=None, before=None):
+        """after/before cursor bo'yicha sahifa; noto'g'ri cursor - birinchi sahifa"""
+        before_values = self._parse(before)
+        if before_values is not None:
+            return KeysetPage(self, before_values, backwards=True)
+        after_values = self._parse(after)
+        invalid = bool(before) or (bool(after) and after_values is None)
+        return KeysetPage(self, after_values, invalid_cursor=invalid)
+
+
+class KeysetPage:
+    """
+    Paginatsiya sahifasi. So'rov birinchi murojaatda bajariladi, shuning uchun
+    sahifa fragment cache ichida ishlatilsa, cache dan o'qilganda baza ishlamaydi.
+    """
+
+    def __init__(self, paginator, values=None, backwards=False, invalid_cursor=False):
+        self.paginator = paginator
+        self.values = values
+        self.backwards = backwards
+        # So'rovda buzilgan cursor bo'lgan (sahifa birinchi sahifa sifatida ko'rsatiladi)
+        self.invalid_cursor = invalid_cursor
+
+    @property
+    def cursor_key(self):
+        """Sahifa kaliti: tekshirilgan qiymatlardan qayta kodlangan cursor"""
+        if self.values is None:
+            return ''
+        return f"{'before' if self.backwards else 'after'}={encode_cursor(self.values)}"
+
+    @cached_property
+    def _result(self):
+        paginator = self.paginator
+        queryset = paginator.queryset
+        ordering = paginator.ordering
+        if self.backwards:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+        if self.values is not None:
+            queryset = queryset.filter(paginator._seek(self.values, backwards=self.backwards))
+
+        rows = list(queryset.order_by(*ordering)[:paginator.per_page + 1])
+        has_more = len(rows) > paginator.per_page
+        rows = rows[:paginator.per_page]
+        if self.backwards:
+            rows.reverse()
+            return rows, True, has_more
+        return rows, has_more, self.values is not None
+
+    @property
+    def object_list(self):
+        return self._result[0]
+
+    @property
+    def has_next(self):
+        return self._result[1] and bool(self.object_list)
+
+    @property
+    def has_previous(self):
+        return self._result[2] and bool(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        return self.paginator.cursor_for(self.object_list[-1]) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        return self.paginator.cursor_for(self.object_list[0]) if self.has_previous else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginationMixin:
+    """?after= / ?before= parametrlari bo'yicha ro'yxatni sahifalash"""
+    paginate_by = CATALOG_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, ordering, prefix=''):
+        """
+        Bir sahifada bir nechta ro'yxat bo'lsa, har biri o'z prefix i bilan
+        (?upcoming_after=...) sahifalanadi; shablonda cursor_prefix beriladi.
+        """
+        paginator = KeysetPaginator(queryset, ordering, self.paginate_by)
+        page = paginator.get_page(
+            after=self.request.GET.get(f'{prefix}after'),
+            before=self.request.GET.get(f'{prefix}before'),
+        )
+        self._keyset_pages = getattr(self, '_keyset_pages', []) + [(prefix, page)]
+        return page
+
+    def get_cache_vary_parts(self):
+        """
+        Fragment cache kaliti (CatalogCacheMixin) xom GET qiymatidan emas,
+        tekshirilgan cursor dan quriladi; buzilgan cursor li sahifa cache lanmaydi
+        """
+        parts = []
+        for prefix, page in getattr(self, '_keyset_pages', ()):
+            if page.invalid_cursor:
+                return None
+            parts.append(f'{prefix}{page.cursor_key}')
+        vary_parts = super().get_cache_vary_parts()
+        return None if vary_parts is None else parts + vary_parts
+
+    def get_catalog_cache_timeout(self):
+        """Birinchi sahifa uzoq, cursor bilan ochilgan sahifalar qisqa muddat saqlanadi"""
+        if any(page.values is not None for _, page in getattr(self, '_keyset_pages', ())):
+            return CATALOG_CURSOR_PAGE_TIMEOUT
+        return super().get_catalog_cache_timeout()
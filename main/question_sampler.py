@@ -0,0 +1,52 @@
+import random
+
+from django.core.cache import cache
+
+
+QUESTION_IDS_TIMEOUT = 60 * 60 * 24  # 24 soat
+
+
+def _cache_key(test_set_id):
+    return f'question_ids:{test_set_id}'
+
+
+def get_question_ids(test_set_id):
+    """Test to'plamidagi savollar ID lari ro'yxati (keshdan yoki bitta so'rov bilan)"""
+    if not test_set_id:
+        return []
+
+    question_ids = cache.get(_cache_key(test_set_id))
+    if question_ids is None:
+        from .models import Question
+
+        question_ids = list(
+            Question.objects.filter(test_set_id=test_set_id).values_list('id', flat=True)
+        )
+        cache.set(_cache_key(test_set_id), question_ids, QUESTION_IDS_TIMEOUT)
+    return question_ids
+
+
+def invalidate_question_ids(test_set_id):
+    """Test to'plami savollar ro'yxatini keshdan o'chirish"""
+    if test_set_id:
+        cache.delete(_cache_key(test_set_id))
+
+
+def sample_questions(test_set_id, k):
+    """
+    Test to'plamidan k ta tasodifiy savolni javoblari bilan qaytaradi.
+
+    order_by('?') butun bankni tasodifiy saralaydi; bu yerda esa keshdagi
+    ID lar ro'yxatidan k ta ID tanlanadi va faqat o'sha savollar yuklanadi.
+    Natija oddiy list - uni qayta sanash yoki render qilish so'rov yubormaydi.
+    """
+    from .models import Question
+
+    question_ids = get_question_ids(test_set_id)
+    sampled_ids = random.sample(question_ids, min(k, len(question_ids)))
+    if not sampled_ids:
+        return []
+
+    questions = Question.objects.filter(id__in=sampled_ids).prefetch_related('answers').in_bulk()
+    # Tanlangan tartibni saqlash (o'chirilgan savollar tashlab ketiladi)
+    return [questions[question_id] for question_id in sampled_ids if question_id in questions]
@@ -0,0 +1,199 @@
+from collections import namedtuple
+from functools import reduce
+
+from django.apps import apps
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.functions import Cast
+from django.urls import reverse
+
+from .uzbek_text import normalize_uzbek_text
+
+
+# O'zbek tili uchun PostgreSQL lug'ati yo'q - so'zlar o'zgarishsiz (simple) indekslanadi
+SEARCH_CONFIG = 'simple'
+SEARCH_RESULT_LIMIT = 50
+SEARCH_QUERY_MIN_LENGTH = 2
+SEARCH_QUERY_MAX_LENGTH = 100
+
+# link_type: 'url' - tashqi havola, 'file' - yuklangan fayl, 'detail' - sayt ichidagi sahifa (link = url nomi)
+SearchSource = namedtuple('SearchSource', 'model_name label title_field vector_fields link link_type')
+
+# natija turi -> manba; vector_fields: (maydon, vazn) - A eng muhim
+SEARCH_SOURCES = {
+    'olympiad': SearchSource(
+        'Olympiad', 'Olimpiada', 'name',
+        (('name', 'A'), ('subject', 'B'), ('country', 'C'), ('short_description', 'D')),
+        'registration_link', 'url',
+    ),
+    'oak_journal': SearchSource(
+        'OakDatabase', 'OAK jurnali', 'journal_name',
+        (('journal_name', 'A'), ('fields', 'B')),
+        'database_link', 'url',
+    ),
+    'conference': SearchSource(
+        'Conference', 'Konferensiya', 'name',
+        (('name', 'A'),),
+        'organizer_link', 'url',
+    ),
+    'dissertation': SearchSource(
+        'DissertationBank', 'Dissertatsiyalar bazasi', 'direction',
+        (('direction', 'A'), ('database_type', 'B')),
+        'link', 'url',
+    ),
+    'article_bank': SearchSource(
+        'ArticleBank', 'Maqolalar bazasi', 'name',
+        (('name', 'A'), ('short_guide', 'C')),
+        'database_link', 'url',
+    ),
+    'regulation': SearchSource(
+        'ResearcherRegulation', 'Nizom', 'regulation_name',
+        (('regulation_name', 'A'),),
+        'file', 'file',
+    ),
+    'announcement': SearchSource(
+        'Announcement', "E'lon", 'title',
+        (('title', 'A'), ('short_text', 'B'), ('detailed_text', 'D')),
+        'main:announcement_detail', 'detail',
+    ),
+}
+
+_SOURCES_BY_MODEL = {source.model_name: source for source in SEARCH_SOURCES.values()}
+
+# search_text ustuni shu maydonlardan normallashtirilgan holda yig'iladi; User faqat admin qidiruvida
+SEARCH_TEXT_FIELDS = {
+    **{
+        source.model_name: tuple(field for field, _ in source.vector_fields)
+        for source in SEARCH_SOURCES.values()
+    },
+    'User': ('username', 'email', 'first_name', 'last_name', 'university'),
+}
+
+SEARCH_TEXT_MODELS = tuple(SEARCH_TEXT_FIELDS)
+
+
+def search_column_values(obj):
+    """
+    Yozuvning search_text va (PostgreSQL da) search_vector ustunlari qiymatlari.
+
+    Vektor ham normallashtirilgan matndan quriladi - aks holda "oʻquv" va
+    "o'quv" turli leksemalarga bo'linadi.
+    """
+    model_name = type(obj).__name__
+    texts = {field: normalize_uzbek_text(getattr(obj, field)) for field in SEARCH_TEXT_FIELDS[model_name]}
+    values = {'search_text': ' '.join(text for text in texts.values() if text)}
+
+    source = _SOURCES_BY_MODEL.get(model_name)
+    if source is not None and connection.vendor == 'postgresql':
+        values['search_vector'] = reduce(lambda a, b: a + b, [
+            SearchVector(Value(texts[field], output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+            for field, weight in source.vector_fields
+        ])
+    return values
+
+
+def update_search_columns(model, batch_size=500):
+    """Butun jadvalning qidiruv ustunlarini qayta hisoblash; yangilangan yozuvlar soni"""
+    manager = model._base_manager
+    queryset = manager.only(*SEARCH_TEXT_FIELDS[model.__name__]).order_by('pk')
+    updated = 0
+    batch = []
+    for obj in queryset.iterator(chunk_size=batch_size):
+        values = search_column_values(obj)
+        for name, value in values.items():
+            setattr(obj, name, value)
+        batch.append(obj)
+        if len(batch) == batch_size:
+            updated += manager.bulk_update(batch, list(values))
+            batch = []
+    if batch:
+        updated += manager.bulk_update(batch, list(values))
+    return updated
+
+
+def search_text_condition(query):
+    """
+    search_text bo'yicha shart: so'rovning har bir so'zi matnda qism-satr
+    sifatida uchrashi yoki (PostgreSQL da) matndagi biror so'zga o'xshashi kerak.
+
+    Ikkala holat ham pg_trgm GIN indeksidan foydalanadi: LIKE '%...%' va "<%"
+    (word_similarity) - shuning uchun xato yozilgan yoki boshqa transliteratsiyadagi
+    so'zlar ham topiladi.
+    """
+    condition = Q()
+    for word in normalize_uzbek_text(query).split():
+        term = Q(search_text__contains=word)
+        if connection.vendor == 'postgresql':
+            term |= Q(search_text__trigram_word_similar=word)
+        condition &= term
+    return condition
+
+
+def _source_queryset(kind, source, condition, rank):
+    model = apps.get_model('main', source.model_name)
+    link = Value('', output_field=TextField()) if source.link_type == 'detail' else Cast(source.link, TextField())
+    return model.objects.filter(condition).order_by().annotate(
+        result_kind=Value(kind, output_field=TextField()),
+        result_title=Cast(source.title_field, TextField()),
+        result_link=link,
+        rank=rank,
+    ).values_list('pk', 'result_kind', 'result_title', 'result_link', 'rank')
+
+
+def _fulltext_rows(query, limit):
+    # websearch: "iqtisodiyot jurnali", -xalqaro, "aniq ibora" ko'rinishidagi so'rovlar
+    search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    condition = Q(search_vector=search_query) | search_text_condition(query)
+    rank = SearchRank(F('search_vector'), search_query) + TrigramWordSimilarity(query, 'search_text')
+    querysets = [
+        _source_queryset(kind, source, condition, rank)
+        for kind, source in SEARCH_SOURCES.items()
+    ]
+    # Har bir qism o'z GIN indekslaridan (tsvector va pg_trgm) o'qiydi; saralash bitta UNION ALL so'rovida
+    return querysets[0].union(*querysets[1:], all=True).order_by('-rank')[:limit]
+
+
+def _fallback_rows(query, limit):
+    """PostgreSQL bo'lmagan (ishlab chiqish) muhit uchun qism-satr qidiruvi"""
+    condition = search_text_condition(query)
+    rows = []
+    for kind, source in SEARCH_SOURCES.items():
+        rows += _source_queryset(kind, source, condition, Value(0.0, output_field=FloatField()))[:limit]
+    return rows[:limit]
+
+
+def _result_url(source, pk, link):
+    if source.link_type == 'detail':
+        return reverse(source.link, args=[pk])
+    if source.link_type == 'file':
+        return default_storage.url(link) if link else ''
+    return link or ''
+
+
+def search_catalog(query, limit=SEARCH_RESULT_LIMIT):
+    """
+    Olimpiadalar, OAK jurnallari, konferensiyalar, dissertatsiya va maqola
+    bazalari, nizomlar va e'lonlar bo'yicha yagona qidiruv.
+
+    Natijalar relevantlik (ts_rank + trigram o'xshashligi) bo'yicha saralangan
+    lug'atlar ro'yxati.
+    """
+    query = normalize_uzbek_text(query)[:SEARCH_QUERY_MAX_LENGTH]
+    if len(query) < SEARCH_QUERY_MIN_LENGTH:
+        return []
+
+    rows = _fulltext_rows(query, limit) if connection.vendor == 'postgresql' else _fallback_rows(query, limit)
+    results = []
+    for pk, kind, title, link, rank in rows:
+        source = SEARCH_SOURCES[kind]
+        results.append({
+            'kind': kind,
+            'label': source.label,
+            'title': title,
+            'url': _result_url(source, pk, link),
+            'external': source.link_type != 'detail',
+            'rank': round(rank, 4),
+        })
+    return results
@@ -1,6 +1,37 @@
-from django.db.models.signals import post_save
+import threading
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models import F
 from django.dispatch import receiver
-from .models import Course, Module
+from .models import (
+    Course, Module, Question, Answer, UserCourseProgress, UserModuleProgress,
+    Olympiad, StateScholarship, BuxduScholarship, ArticleBank, Announcement, User
+)
+from .answer_keys import invalidate_answer_key
+from .course_progress import recount_course_progress
+from .question_sampler import invalidate_question_ids
+from .home_cache import TALENTED_STUDENT_FIELDS, invalidate_home_blocks
+from .catalog_cache import CATALOG_MODELS, bump_catalog_version
+from .search import SEARCH_TEXT_FIELDS, SEARCH_TEXT_MODELS, search_column_values
+
+
+# create_course_modules ichida modullar o'zgarayotgan kurslar - ular uchun
+# hisoblagichlar har bir modulda emas, sikldan keyin bir marta qayta hisoblanadi
+_deferred_recount = threading.local()
+
+
+@contextmanager
+def _defer_course_recount(course):
+    courses = _deferred_recount.__dict__.setdefault('course_ids', set())
+    courses.add(course.pk)
+    try:
+        yield
+    finally:
+        courses.discard(course.pk)
+    recount_course_progress(UserCourseProgress.objects.filter(course=course))
 
 
 @receiver(post_save, sender=Course)
@@ -16,15 +47,131 @@ def create_course_modules(sender, instance, created, **kwargs):
         
         if current_modules < target_count:
             # Yetishmayotgan modullarni yaratish
-            for i in range(current_modules + 1, target_count + 1):
-                Module.objects.get_or_create(
-                    course=instance,
-                    number=i,
-                    defaults={
-                        'name': f'Modul {i}',
-                        'description': f'{instance.name} - {i}-modul'
-                    }
-                )
+            with _defer_course_recount(instance):
+                for i in range(current_modules + 1, target_count + 1):
+                    Module.objects.get_or_create(
+                        course=instance,
+                        number=i,
+                        defaults={
+                            'name': f'Modul {i}',
+                            'description': f'{instance.name} - {i}-modul'
+                        }
+                    )
         elif current_modules > target_count:
             # Ortiqcha modullarni o'chirish
-            instance.modules.filter(number__gt=target_count).delete()
+            with _defer_course_recount(instance):
+                instance.modules.filter(number__gt=target_count).delete()
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def update_course_progress_counters(sender, instance, created=False, **kwargs):
+    """
+    Modul qo'shilganda yoki o'chirilganda shu kursdagi barcha UserCourseProgress
+    hisoblagichlarini yangilash (create_course_modules da - sikldan keyin bir marta)
+    """
+    if kwargs['signal'] is post_save and not created:
+        return
+    if instance.course_id in getattr(_deferred_recount, 'course_ids', ()):
+        return
+    recount_course_progress(UserCourseProgress.objects.filter(course_id=instance.course_id))
+
+
+@receiver(post_delete, sender=UserModuleProgress)
+def decrement_completed_modules(sender, instance, **kwargs):
+    """Tugatilgan modul progressi o'chirilganda hisoblagichni kamaytirish"""
+    if instance.is_completed:
+        UserCourseProgress.objects.filter(
+            user_id=instance.user_id,
+            course__modules=instance.module_id,
+            completed_modules__gt=0
+        ).update(completed_modules=F('completed_modules') - 1)
+
+
+@receiver(pre_save, sender=Question)
+def remember_question_test_set(sender, instance, **kwargs):
+    """Savol boshqa test to'plamiga ko'chirilsa, eski to'plam kalitini ham tozalash uchun"""
+    instance._previous_test_set_id = None
+    if instance.pk:
+        instance._previous_test_set_id = Question.objects.filter(
+            pk=instance.pk
+        ).values_list('test_set_id', flat=True).first()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_answer_key(sender, instance, **kwargs):
+    """Savol o'zgarganda yoki o'chirilganda javoblar kaliti va savollar ro'yxatini yangilash"""
+    invalidate_answer_key(instance.test_set_id)
+    invalidate_question_ids(instance.test_set_id)
+    previous_test_set_id = getattr(instance, '_previous_test_set_id', None)
+    if previous_test_set_id != instance.test_set_id:
+        invalidate_answer_key(previous_test_set_id)
+        invalidate_question_ids(previous_test_set_id)
+
+
+# Javoblar to'plam holida o'zgartirilayotganda (DOCX import) har bir javob uchun
+# test_set_id so'rovi qilinmaydi - kalitni chaqiruvchi o'zi tozalaydi
+_answer_key_signals = threading.local()
+
+
+@contextmanager
+def mute_answer_key_signals():
+    _answer_key_signals.muted = True
+    try:
+        yield
+    finally:
+        _answer_key_signals.muted = False
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def invalidate_answer_answer_key(sender, instance, **kwargs):
+    """Javob o'zgarganda yoki o'chirilganda javoblar kalitini yangilash"""
+    if getattr(_answer_key_signals, 'muted', False):
+        return
+    test_set_id = Question.objects.filter(
+        pk=instance.question_id
+    ).values_list('test_set_id', flat=True).first()
+    invalidate_answer_key(test_set_id)
+
+
+def invalidate_home_page_cache(sender, instance, **kwargs):
+    """Bosh sahifadagi hisoblagichlar, e'lonlar va iqtidorli talabalar cache ini tozalash"""
+    update_fields = kwargs.get('update_fields')
+    # last_login kabi maydonlar saqlanganda iqtidorli talabalar bloki o'zgarmaydi
+    if sender is User and update_fields is not None and not set(update_fields) & set(TALENTED_STUDENT_FIELDS):
+        return
+    invalidate_home_blocks(sender.__name__)
+
+
+for _model in (Olympiad, StateScholarship, BuxduScholarship, Course, ArticleBank, Announcement, User):
+    post_save.connect(invalidate_home_page_cache, sender=_model, dispatch_uid=f'home_cache_save_{_model.__name__}')
+    post_delete.connect(invalidate_home_page_cache, sender=_model, dispatch_uid=f'home_cache_delete_{_model.__name__}')
+
+
+def bump_catalog_page_version(sender, instance, **kwargs):
+    """Katalog sahifalarining (olimpiadalar, jurnallar, stipendiyalar...) cache versiyasini oshirish"""
+    # Tranzaksiya tugagach: aks holda commit dan oldingi so'rov yangi versiya
+    # kaliti ostida hali eski qatorlarni saqlab qo'yadi
+    model_name = sender.__name__
+    transaction.on_commit(lambda: bump_catalog_version(model_name))
+
+
+for _model_name in CATALOG_MODELS:
+    _model = apps.get_model('main', _model_name)
+    post_save.connect(bump_catalog_page_version, sender=_model, dispatch_uid=f'catalog_cache_save_{_model_name}')
+    post_delete.connect(bump_catalog_page_version, sender=_model, dispatch_uid=f'catalog_cache_delete_{_model_name}')
+
+
+def refresh_search_columns(sender, instance, update_fields=None, **kwargs):
+    """Saqlangan yozuvning search_text/search_vector ustunlarini yangilash"""
+    # last_login kabi qidiruvga aloqasiz maydonlar saqlanganda qayta hisoblanmaydi
+    if update_fields is not None and not set(update_fields) & set(SEARCH_TEXT_FIELDS[sender.__name__]):
+        return
+    sender._base_manager.filter(pk=instance.pk).update(**search_column_values(instance))
+
+
+for _model_name in SEARCH_TEXT_MODELS:
+    post_save.connect(refresh_search_columns, sender=apps.get_model('main', _model_name),
+                      dispatch_uid=f'search_columns_{_model_name}')
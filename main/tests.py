@@ -1,3 +1,483 @@
-from django.test import TestCase
+import base64
+import json
+import re
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import reverse
+
+from docx import Document
+from PIL import Image
+
+from .catalog_cache import CATALOG_FRAGMENT_TIMEOUT, get_catalog_versions
+from .course_progress import get_course_progress
+from .docx_parser import save_questions_from_docx
+from .forms import UserUpdateForm
+from .models import (
+    Answer, ArticleBank, AssessmentTest, AssessmentTestResult, BuxduOlympiad, BuxduOlympiadImage, Certificate,
+    CertificateJob, Conference, Course, DissertationBank, Module, OakDatabase, Olympiad, Question, TestAttempt,
+    TestSet, User, UserCourseProgress, UserModuleProgress, UserTestResult
+)
+from .pagination import CATALOG_CURSOR_PAGE_TIMEOUT, CATALOG_PAGE_SIZE, decode_cursor
+
+
+class CourseDetailQueryCountTests(TestCase):
+    """Kurs sahifasidagi so'rovlar soni modullar soniga bog'liq bo'lmasligi kerak"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        # post_save signali module_count bo'yicha modullarni yaratadi
+        cls.small_course = Course.objects.create(name='Kichik kurs', module_count=3)
+        cls.large_course = Course.objects.create(name='Katta kurs', module_count=12)
+        for course in (cls.small_course, cls.large_course):
+            first, second = course.modules.order_by('number')[:2]
+            UserModuleProgress.objects.create(user=cls.user, module=first, is_completed=True)
+            UserModuleProgress.objects.create(user=cls.user, module=second, viewed_presentation=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _get(self, course):
+        response = self.client.get(reverse('main:course_detail', kwargs={'pk': course.pk}))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_does_not_depend_on_module_count(self):
+        # Birinchi ochilishda UserCourseProgress yaratiladi - o'lchovga kirmaydi
+        self._get(self.small_course)
+        self._get(self.large_course)
+
+        with CaptureQueriesContext(connection) as small_queries:
+            response = self._get(self.small_course)
+        self.assertEqual(len(response.context['modules']), 3)
+
+        with self.assertNumQueries(len(small_queries)):
+            response = self._get(self.large_course)
+        self.assertEqual(len(response.context['modules']), 12)
+
+
+class CourseProgressCounterTests(TestCase):
+    """UserCourseProgress hisoblagichlari admin va module_count o'zgarishlarida to'g'ri qolishi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        cls.course = Course.objects.create(name='Kurs', module_count=3)
+        cls.module = cls.course.modules.get(number=1)
+        cls.progress = UserModuleProgress.objects.create(user=cls.user, module=cls.module)
+        cls.course_progress = get_course_progress(cls.user, cls.course)
+
+    def test_admin_change_of_is_completed_updates_counter(self):
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:main_usermoduleprogress_change', args=[self.progress.pk])
+        response = self.client.post(url, {
+            'user': self.user.pk, 'module': self.module.pk, 'is_completed': 'on',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.completed_modules, 1)
+
+    def test_module_count_change_recounts_once(self):
+        self.course.module_count = 8
+        with CaptureQueriesContext(connection) as queries:
+            self.course.save()
+        recounts = [q for q in queries if q['sql'].startswith('UPDATE') and 'user_course_progress' in q['sql']]
+        self.assertEqual(len(recounts), 1)
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.total_modules, 8)
+
+        self.course.module_count = 2
+        self.course.save()
+        self.course_progress.refresh_from_db()
+        self.assertEqual(self.course_progress.total_modules, 2)
+
+
+class CatalogCacheKeyTests(TestCase):
+    """Katalog fragment kaliti xom GET qiymatidan emas, tekshirilgan cursor dan quriladi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        DissertationBank.objects.bulk_create([
+            DissertationBank(database_type='PhD', direction=f'Yo\'nalish {i}', link='https://example.com/')
+            for i in range(CATALOG_PAGE_SIZE + 5)
+        ])
+
+    def _get(self, **params):
+        response = self.client.get(reverse('main:dissertatsiyalar_banki'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_equivalent_cursors_share_a_key(self):
+        cursor = self._get().context['page_obj'].next_cursor
+        # Xuddi shu qiymatlar, boshqacha yozilgan JSON
+        spaced = base64.urlsafe_b64encode(json.dumps(decode_cursor(cursor)).encode()).decode()
+        self.assertNotEqual(spaced, cursor)
+
+        response = self._get(after=cursor)
+        self.assertEqual(self._get(after=spaced).context['catalog_cache_key'], response.context['catalog_cache_key'])
+
+    def test_cursor_pages_have_short_timeout(self):
+        first_page = self._get()
+        self.assertEqual(first_page.context['catalog_cache_timeout'], CATALOG_FRAGMENT_TIMEOUT)
+        # To'g'ri formatdagi istalgan cursor yangi kalit beradi - abadiy saqlanmasligi kerak
+        response = self._get(after=first_page.context['page_obj'].next_cursor)
+        self.assertEqual(response.context['catalog_cache_timeout'], CATALOG_CURSOR_PAGE_TIMEOUT)
+        self.assertIsNotNone(response.context['catalog_cache_timeout'])
+
+    def test_version_is_bumped_after_commit(self):
+        before = get_catalog_versions(['DissertationBank'])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            DissertationBank.objects.create(database_type='DSc', direction='Tarix', link='https://example.com/')
+            # Commit dan oldin o'qigan so'rov eski versiyani ko'radi
+            self.assertEqual(get_catalog_versions(['DissertationBank']), before)
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(get_catalog_versions(['DissertationBank']), before)
+
+    def test_invalid_cursor_is_not_cached(self):
+        response = self._get(after='buzilgan-cursor')
+        self.assertEqual(response.context['catalog_cache_timeout'], 0)
+        self.assertEqual(len(response.context['page_obj']), CATALOG_PAGE_SIZE)
+
+
+# Rejada jadvalni indeks orqali o'qiydigan tugunlar (Bitmap Index Scan tugunida
+# Relation Name bo'lmaydi - uning ustidagi Bitmap Heap Scan tekshiriladi)
+PG_INDEX_NODES = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+
+@skipUnless(connection.vendor == 'postgresql', "EXPLAIN (FORMAT JSON) rejasi PostgreSQL uchun")
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'query-plan-tests',
+}})
+class QueryPlanTests(TestCase):
+    """
+    Asosiy sahifalarning filtrlangan/saralangan so'rovlari indeks orqali
+    bajarilishi kerak. Test bazasida jadvallar kichik bo'lgani uchun
+    enable_seqscan o'chiriladi: mos indeks bo'lmasa, reja baribir Seq Scan bo'ladi.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        Olympiad.objects.bulk_create([
+            Olympiad(type=('international', 'republic', 'online')[i % 3], subject=f'Fan {i}', name=f'Olimpiada {i}',
+                     country='O\'zbekiston', short_description='', date=today + timedelta(days=i - 5),
+                     registration_link='https://example.com/')
+            for i in range(10)
+        ])
+        BuxduOlympiad.objects.bulk_create([
+            BuxduOlympiad(subject=f'Fan {i}', date=today + timedelta(days=i - 5), description='',
+                          image='buxdu_olympiads/images/x.jpg', program_file='buxdu_olympiads/programs/x.pdf',
+                          registration_link_1='https://example.com/')
+            for i in range(10)
+        ])
+        OakDatabase.objects.bulk_create([
+            OakDatabase(type=('local', 'international')[i % 2], journal_name=f'Jurnal {i}', fields='',
+                        database_link='https://example.com/', editorial_link='https://example.com/')
+            for i in range(10)
+        ])
+        Conference.objects.bulk_create([
+            Conference(type=('republic', 'international')[i % 2], name=f'Konferensiya {i}',
+                       information_letter='conferences/x.pdf', organizer_link='https://example.com/')
+            for i in range(10)
+        ])
+        DissertationBank.objects.bulk_create([
+            DissertationBank(database_type='PhD', direction=f'Yo\'nalish {i}', link='https://example.com/')
+            for i in range(10)
+        ])
+        ArticleBank.objects.bulk_create([
+            ArticleBank(name=f'Baza {i}', short_guide='', database_link='https://example.com/')
+            for i in range(10)
+        ])
+
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+        User.objects.bulk_create([
+            User(username=f'talented_{i}', email=f'talented_{i}@example.com', status='iqtidorli')
+            for i in range(5)
+        ])
+        cls.course = Course.objects.create(name='Kurs', module_count=3)
+        UserTestResult.objects.create(user=cls.user, course=cls.course, score=0, total_questions=10,
+                                      correct_answers=0, percentage=0, passed=False)
+        assessment = AssessmentTest.objects.create(description='')
+        AssessmentTestResult.objects.create(user=cls.user, assessment_test=assessment, score=0,
+                                            total_questions=10, correct_answers=0, percentage=0)
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        with connection.cursor() as cursor:
+            # Faqat shu test tranzaksiyasi uchun
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def _explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            plan = cursor.fetchone()[0]
+        return plan if isinstance(plan, list) else json.loads(plan)
+
+    def _table_scans(self, plan, table):
+        """Jadvalni o'qiydigan reja tugunlari: [(tavsif, indeks ishlatilganmi)]"""
+        scans = []
+        nodes = [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get('Plans', []))
+            if node.get('Relation Name') == table:
+                desc = node['Node Type'] + (f" ({node['Index Name']})" if 'Index Name' in node else '')
+                scans.append((desc, node['Node Type'] in PG_INDEX_NODES))
+        return scans
+
+    def assertIndexedQueries(self, url, table, user=None):
+        if user:
+            self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        pattern = re.compile(rf'(FROM|JOIN) "{re.escape(table)}"')
+        statements = [
+            query['sql'] for query in queries
+            if pattern.search(query['sql']) and re.search(r'\b(WHERE|ORDER BY)\b', query['sql'])
+        ]
+        self.assertTrue(statements, f"{url}: {table} jadvaliga so'rov topilmadi")
+        for sql in statements:
+            scans = self._table_scans(self._explain(sql), table)
+            with self.subTest(url=url, sql=sql):
+                self.assertTrue(scans and all(ok for _, ok in scans), f"Indekssiz o'qish: {scans}")
+
+    def test_catalog_pages_use_indexes(self):
+        for name, table in [
+            ('main:xalqaro_olimpiadalar', 'olympiads'),
+            ('main:olimpiadalar', 'olympiads'),
+            ('main:buxdu_olimpiadalari', 'buxdu_olympiads'),
+            ('main:mahalliy_oak_jurnallari', 'oak_database'),
+            ('main:respublika_konferensiyalar', 'conferences'),
+            ('main:dissertatsiyalar_banki', 'dissertation_bank'),
+            ('main:maqolalar_banki', 'article_bank'),
+        ]:
+            self.assertIndexedQueries(reverse(name), table)
+
+    def test_home_page_talented_students_use_index(self):
+        self.assertIndexedQueries(reverse('main:home'), 'users')
+
+    def test_course_page_test_results_use_index(self):
+        self.assertIndexedQueries(reverse('main:course_detail', kwargs={'pk': self.course.pk}),
+                                  'user_test_results', self.user)
+
+    def test_profile_assessment_results_use_index(self):
+        self.assertIndexedQueries(reverse('main:profile'), 'assessment_test_results', self.user)
+
+
+def _seed_admin_rows(numbers):
+    """Ro'yxatlarda bog'langan obyektlari ko'rsatiladigan modellar uchun qatorlar"""
+    now = timezone.now()
+    users = User.objects.bulk_create([
+        User(username=f'admin_check_{n}', email=f'admin_check_{n}@example.com', first_name=f'Ism {n}')
+        for n in numbers
+    ])
+    test_sets = TestSet.objects.bulk_create([TestSet(name=f'Test {n}') for n in numbers])
+    questions = Question.objects.bulk_create([
+        Question(test_set=test_set, number=1, text=f'Savol {n}') for n, test_set in zip(numbers, test_sets)
+    ])
+    Answer.objects.bulk_create([
+        Answer(question=question, text=letter, is_correct=letter == 'A')
+        for question in questions for letter in 'ABCD'
+    ])
+
+    # bulk_create signallarni chaqirmaydi - modullar shu yerda yaratiladi
+    courses = Course.objects.bulk_create([
+        Course(name=f'Kurs {n}', test_set=test_set) for n, test_set in zip(numbers, test_sets)
+    ])
+    modules = Module.objects.bulk_create([
+        Module(course=course, number=1, name='Kirish', description='') for course in courses
+    ])
+    UserCourseProgress.objects.bulk_create([
+        UserCourseProgress(user=user, course=course) for user, course in zip(users, courses)
+    ])
+    UserModuleProgress.objects.bulk_create([
+        UserModuleProgress(user=user, module=module) for user, module in zip(users, modules)
+    ])
+    results = UserTestResult.objects.bulk_create([
+        UserTestResult(user=user, course=course, score=8, total_questions=10, correct_answers=8,
+                       percentage=80, passed=True)
+        for user, course in zip(users, courses)
+    ])
+    TestAttempt.objects.bulk_create([
+        TestAttempt(user=user, course=course, deadline=now + timedelta(hours=1))
+        for user, course in zip(users, courses)
+    ])
+    Certificate.objects.bulk_create([
+        Certificate(user=result.user, course=result.course, test_result=result,
+                    certificate_file='certificates/x.pdf')
+        for result in results
+    ])
+    CertificateJob.objects.bulk_create([
+        CertificateJob(user=result.user, course=result.course, test_result=result) for result in results
+    ])
+    assessments = AssessmentTest.objects.bulk_create([
+        AssessmentTest(description='', test_set=test_set) for test_set in test_sets
+    ])
+    AssessmentTestResult.objects.bulk_create([
+        AssessmentTestResult(user=user, assessment_test=assessment, score=8, total_questions=10,
+                             correct_answers=8, percentage=80)
+        for user, assessment in zip(users, assessments)
+    ])
+
+    olympiads = BuxduOlympiad.objects.bulk_create([
+        BuxduOlympiad(subject=f'Fan {n}', date=now.date(), description='',
+                      image='buxdu_olympiads/images/x.jpg', program_file='buxdu_olympiads/programs/x.pdf',
+                      registration_link_1='https://example.com/')
+        for n in numbers
+    ])
+    BuxduOlympiadImage.objects.bulk_create([
+        BuxduOlympiadImage(olympiad=olympiad, image='buxdu_olympiads/gallery/x.jpg')
+        for olympiad in olympiads for _ in range(2)
+    ])
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    """Admin ro'yxat sahifalarida qatorlar soni oshganda so'rovlar soni o'zgarmasligi kerak (N+1 yo'q)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        _seed_admin_rows(range(2))
+
+    def test_changelist_query_count_does_not_depend_on_rows(self):
+        self.client.force_login(self.admin_user)
+        urls = {
+            model: reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            for model in admin.site._registry
+        }
+        before = {}
+        for model, url in urls.items():
+            # Birinchi ochilish (ContentType va h.k. cache lari) hisobga olinmaydi
+            self.assertEqual(self.client.get(url).status_code, 200)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            before[model] = len(queries)
+
+        _seed_admin_rows(range(2, 32))
+        for model, url in urls.items():
+            with self.subTest(model=model._meta.label), self.assertNumQueries(before[model]):
+                self.client.get(url)
+
+
+class DocxImportTests(TestCase):
+    """DOCX dan savollarni yuklash"""
+
+    def _docx(self, count):
+        document = Document()
+        for number in range(1, count + 1):
+            for line in (f'## {number}-savol', f'Savol {number}', 'A) Bir', 'B) Ikki', 'C) Uch', 'Javob: B'):
+                document.add_paragraph(line)
+        buffer = BytesIO()
+        document.save(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def _replace_queries(self, existing):
+        test_set = TestSet.objects.create(name=f'Test {existing}')
+        save_questions_from_docx(test_set, self._docx(existing))
+        with CaptureQueriesContext(connection) as queries:
+            report = save_questions_from_docx(test_set, self._docx(3))
+        self.assertTrue(report.ok, report.errors)
+        self.assertEqual(report.deleted, existing)
+        self.assertEqual(Answer.objects.filter(question__test_set=test_set).count(), 9)
+        self.assertEqual(Answer.objects.filter(question__test_set=test_set, is_correct=True).count(), 3)
+        return len(queries)
+
+    def test_replacing_questions_does_not_query_per_answer(self):
+        self.assertEqual(self._replace_queries(2), self._replace_queries(10))
+
+
+class CertificateJobRequeueTests(TestCase):
+    """Admin dagi qayta navbatga qo'yish amali cert_job_one_active cheklovini buzmasligi"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        cls.course = Course.objects.create(name='Kurs')
+        cls.busy_user = User.objects.create_user(username='busy', email='busy@example.com', password='x')
+        cls.failed_user = User.objects.create_user(username='failed', email='failed@example.com', password='x')
+        cls.busy_failed = cls._job(cls.busy_user, 'failed')
+        cls.busy_pending = cls._job(cls.busy_user, 'pending')
+        cls.older_failed = cls._job(cls.failed_user, 'failed')
+        cls.newest_failed = cls._job(cls.failed_user, 'failed')
+        cls.processing = cls._job(
+            User.objects.create_user(username='worker', email='worker@example.com', password='x'), 'processing'
+        )
+
+    @classmethod
+    def _job(cls, user, status):
+        result = UserTestResult.objects.create(user=user, course=cls.course, score=8, total_questions=10,
+                                               correct_answers=8, percentage=80, passed=True)
+        return CertificateJob.objects.create(user=user, course=cls.course, test_result=result, status=status)
+
+    def test_requeues_only_newest_failed_job_without_active_one(self):
+        self.client.force_login(self.admin_user)
+        response = self.client.post(reverse('admin:main_certificatejob_changelist'), {
+            'action': 'requeue_jobs',
+            '_selected_action': [job.pk for job in CertificateJob.objects.all()],
+        }, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "1 ta vazifa navbatga qaytarildi, 4 ta o&#x27;tkazib yuborildi")
+
+        statuses = dict(CertificateJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[self.newest_failed.pk], 'pending')
+        self.assertEqual(statuses[self.older_failed.pk], 'failed')
+        self.assertEqual(statuses[self.busy_failed.pk], 'failed')
+        self.assertEqual(statuses[self.busy_pending.pk], 'pending')
+        self.assertEqual(statuses[self.processing.pk], 'processing')
+
+
+class AvatarDerivativeTests(TestCase):
+    """Profil rasmi saqlangandan keyin kichik va sertifikat avatarlari yaratilishi"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='student', email='student@example.com', password='x')
+
+    def _form(self):
+        buffer = BytesIO()
+        Image.new('RGB', (400, 300), (200, 10, 10)).save(buffer, 'PNG')
+        return UserUpdateForm(
+            {'first_name': 'Ali', 'last_name': 'Valiyev', 'email': 'student@example.com'},
+            {'profile_image': SimpleUploadedFile('rasm.png', buffer.getvalue(), 'image/png')},
+            instance=self.user,
+        )
+
+    def _assert_derivatives(self):
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.avatar_small.name.endswith('_small.webp'))
+        self.assertTrue(self.user.avatar_certificate.name.endswith('_certificate.jpg'))
+
+    def test_commit(self):
+        form = self._form()
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self._assert_derivatives()
+
+    def test_commit_false_builds_after_save_m2m(self):
+        form = self._form()
+        self.assertTrue(form.is_valid(), form.errors)
+        user = form.save(commit=False)
+        self.assertFalse(user.avatar_small)
+        user.save()
+        form.save_m2m()
+        self._assert_derivatives()
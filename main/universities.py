@@ -0,0 +1,125 @@
+import re
+import threading
+from bisect import bisect_left
+
+from .uzbek_text import normalize_uzbek_text
+
+
+UNIVERSITY_API_URL = 'https://prof-emis.edu.uz/api/v2/integration/stat/public/university?limit=10000'
+
+OTHER_CHOICE = ('Boshqa', 'Boshqa')
+
+# Jadval hali sinxronlanmagan bo'lsa ishlatiladigan ro'yxat
+DEFAULT_UNIVERSITIES = [
+    'Toshkent davlat universiteti',
+    'O\'zbekiston Milliy universiteti',
+    'Samarqand davlat universiteti',
+    'Buxoro davlat universiteti',
+]
+
+
+def _load_university_names():
+    """Faol OTM nomlari (DB -> default ro'yxat). Tarmoqqa murojaat qilmaydi."""
+    from .models import University
+
+    names = list(University.objects.filter(is_active=True).order_by('name').values_list('name', flat=True))
+    return names or list(DEFAULT_UNIVERSITIES)
+
+
+def get_university_list_version():
+    """
+    Ro'yxat versiyasi to'g'ridan-to'g'ri DB dan: oxirgi o'zgarish vaqti va
+    yozuvlar soni. Jarayonlar umumiy cache ga bog'liq bo'lmagani uchun admin
+    yoki sync_universities o'zgarishini har bir jarayon keyingi so'rovda ko'radi.
+    """
+    from django.db.models import Count, Max
+    from .models import University
+
+    version = University.objects.aggregate(updated=Max('updated_at'), total=Count('id'))
+    return version['updated'], version['total']
+
+
+# So'z boshlari: qator boshi yoki bo'shliq, qavs, qo'shtirnoq, chiziqchadan keyingi belgi
+_WORD_START_RE = re.compile(r'(?:^|(?<=[\s("«-]))\S')
+
+
+def normalize_university_name(text):
+    """Qidiruv uchun nomni soddalashtirish (main/uzbek_text.py)"""
+    return normalize_uzbek_text(text)
+
+
+class UniversityIndex:
+    """
+    OTM nomlari bo'yicha xotiradagi prefiks indeks.
+
+    Har bir nomning har bir so'zi boshidan boshlanuvchi qatorlar tartiblangan
+    ro'yxatda saqlanadi, shuning uchun "davlat" so'rovi ham "Buxoro davlat
+    universiteti" ni bisect orqali topadi. So'z o'rtasidagi qismlar uchun
+    nomlar ustidan oddiy qidiruv qilinadi.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.normalized = [normalize_university_name(name) for name in self.names]
+        self.exact = {}
+        keys = []
+        for i, key in enumerate(self.normalized):
+            self.exact.setdefault(key, self.names[i])
+            for match in _WORD_START_RE.finditer(key):
+                keys.append((key[match.start():], i))
+        keys.sort()
+        self.keys = keys
+        self.key_strings = [key for key, _ in keys]
+
+    def resolve(self, value):
+        """Kiritilgan qiymatga mos keladigan aniq nom (yoki None)"""
+        return self.exact.get(normalize_university_name(value))
+
+    def search(self, query, limit=10):
+        """
+        Natijalar tartibi: nom so'rov bilan boshlanadi, so'zlardan biri so'rov
+        bilan boshlanadi, nom ichida so'rov bor.
+        """
+        query = normalize_university_name(query)
+        if not query or limit <= 0:
+            return []
+
+        # Kalitlar tartiblangan, shuning uchun nomi so'rov bilan boshlanganlar alifbo
+        # tartibida keladi va limitga yetgach qolganini ko'rish shart emas
+        starts, words = [], []
+        seen = set()
+        position = bisect_left(self.key_strings, query)
+        while position < len(self.keys) and len(starts) < limit and self.key_strings[position].startswith(query):
+            i = self.keys[position][1]
+            if i not in seen:
+                seen.add(i)
+                (starts if self.normalized[i].startswith(query) else words).append(i)
+            position += 1
+
+        ranked = starts + words
+        if len(ranked) < limit:
+            ranked += [i for i, key in enumerate(self.normalized) if i not in seen and query in key]
+        return [self.names[i] for i in ranked[:limit]]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_university_index():
+    """Joriy jarayon uchun indeks (DB dagi ro'yxat versiyasi o'zgarganda qayta quriladi)"""
+    global _index, _index_version
+
+    version = get_university_list_version()
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index = UniversityIndex(_load_university_names())
+                _index_version = version
+    return _index
+
+
+def get_university_names():
+    """Faol OTM nomlari (joriy indeksdan)"""
+    return get_university_index().names
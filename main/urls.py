@@ -8,11 +8,14 @@ urlpatterns = [
     path('', views.index_view, name='home'),
     path('courses/', views.CoursesView.as_view(), name='courses'),
     path('courses/<int:pk>/', views.CourseDetailView.as_view(), name='course_detail'),
+    path('courses/<int:pk>/test-section/', views.course_test_section, name='course_test_section'),
     path('courses/<int:course_id>/test/', views.course_test_view, name='course_test'),
     path('courses/<int:course_id>/test/submit/', views.submit_test, name='submit_test'),
     path('module/<int:module_id>/complete/', views.complete_module, name='complete_module'),
     path('module/<int:module_id>/track-presentation/', views.track_presentation, name='track_presentation'),
     path('module/<int:module_id>/track-video/', views.track_video, name='track_video'),
+    path('module/<int:module_id>/presentation/', views.download_presentation, name='download_presentation'),
+    path('module/events/', views.track_module_events, name='track_module_events'),
     
     # E'lonlar
     path('announcement/<int:pk>/', views.announcement_detail_view, name='announcement_detail'),
@@ -20,6 +23,7 @@ urlpatterns = [
     # Iqtidorli talabalar
     path('iqtidorli-sorovnoma/', views.IqtidorliSorovnomaView.as_view(), name='iqtidorli_sorovnoma'),
     path('iqtidorli-baza/', views.IqtidorliBazaView.as_view(), name='iqtidorli_baza'),
+    path('iqtidorli-baza/<int:pk>/download/', views.download_talented_database, name='download_talented_database'),
     
     # Stipendiyalar
     path('davlat-stipendiyalari/', views.DavlatStipendiyalariView.as_view(), name='davlat_stipendiyalari'),
@@ -48,6 +52,9 @@ urlpatterns = [
     path('maqola-jurnal-tavsiyasi/', views.MaqolaJurnalTavsiyasiView.as_view(), name='maqola_jurnal_tavsiyasi'),
     path('ilmiy-nizomlar/', views.IlmiyNizomlarView.as_view(), name='ilmiy_nizomlar'),
     
+    # Qidiruv
+    path('qidiruv/', views.search_view, name='search'),
+    
     # Auth
     path('login/', views.login_view, name='login'),
     path('register/', views.register_view, name='register'),
@@ -57,6 +64,8 @@ urlpatterns = [
     
     # Certificates
     path('certificate/<int:certificate_id>/download/', views.download_certificate, name='download_certificate'),
+    path('certificate/status/', views.certificate_status, name='certificate_status'),
+    path('universities/search/', views.university_search, name='university_search'),
     
     # Saralash testi (Assessment Test)
     path('assessment-test/', views.assessment_test_view, name='assessment_test'),
@@ -0,0 +1,38 @@
+import re
+import unicodedata
+
+
+# O'zbekcha tutuq belgisining barcha ko'rinishlari (o', o`, oʻ, o’ ...) bitta belgiga keltiriladi
+_APOSTROPHES = "'`´ʻʼʹʽ‘’′"
+
+# Kirill yozuvidagi matn lotin yozuviga o'giriladi (kichik harflar - casefold dan keyin)
+_CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j', 'з': 'z',
+    'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r',
+    'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh',
+    'ъ': "'", 'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya',
+    'ў': "o'", 'қ': 'q', 'ғ': "g'", 'ҳ': 'h',
+}
+
+# Turkcha klaviaturada yoziladigan harflar (ğ, ş, ç, ö) o'zbek lotin yozuvidagi juftligiga
+_TURKIC_TO_UZBEK = {'ğ': "g'", 'ş': 'sh', 'ç': 'ch', 'ö': "o'"}
+
+_TRANSLATION = str.maketrans({
+    **{char: "'" for char in _APOSTROPHES},
+    **_CYRILLIC_TO_LATIN,
+    **_TURKIC_TO_UZBEK,
+})
+
+_SPACES_RE = re.compile(r'\s+')
+
+
+def normalize_uzbek_text(text):
+    """
+    Qidiruv uchun matnni yagona ko'rinishga keltirish.
+
+    Kichik harf, bitta tutuq belgisi, kirill -> lotin, ortiqcha bo'shliqlarsiz:
+    "O‘zbekiston", "oʻzbekiston" va "Ўзбекистон" bir xil "o'zbekiston" bo'ladi.
+    Saqlangan search_text ustunlari ham, so'rov ham shu funksiyadan o'tadi.
+    """
+    text = unicodedata.normalize('NFC', text or '').casefold().translate(_TRANSLATION)
+    return _SPACES_RE.sub(' ', text).strip()
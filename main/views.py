@@ -7,24 +7,24 @@ from django.contrib import messages
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
 from .forms import UserRegisterForm, UserLoginForm, UserUpdateForm
+from .answer_keys import get_answer_key, grade_answers
+from .question_sampler import sample_questions
+from .course_progress import get_course_progress, apply_module_events
+from .catalog_cache import CatalogCacheMixin
+from .pagination import KeysetPaginationMixin
 from .models import (Olympiad, StateScholarship, BuxduScholarship, Course, ArticleBank, Announcement, User, 
                      Survey, TalentedStudentDatabase, BuxduWinnerDatabase, BuxduOlympiadWinner, BuxduOlympiad,
                      OakDatabase, Conference, DissertationBank, ResearcherRegulation, UserCourseProgress, 
-                     UserModuleProgress, UserTestResult, Question, AssessmentTest, AssessmentTestResult)
+                     UserModuleProgress, UserTestResult, Question, AssessmentTest, AssessmentTestResult,
+                     TestAttempt)
 
 
 def index_view(request):
-    announcements = Announcement.objects.order_by('-created_at')[:3]
-    talented_students = User.objects.filter(status='iqtidorli').order_by('-created_at')[:4]
-    context = {
-        'olympiad_count': Olympiad.objects.count(),
-        'scholarship_count': StateScholarship.objects.count() + BuxduScholarship.objects.count(),
-        'course_count': Course.objects.count(),
-        'article_count': ArticleBank.objects.count(),
-        'announcements': announcements,
-        'talented_students': talented_students,
-    }
-    return render(request, 'index.html', context)
+    from .home_cache import get_home_context
+    
+    # Hisoblagichlar, e'lonlar va iqtidorli talabalar cache dan olinadi
+    # (model o'zgarganda signals.py tozalaydi)
+    return render(request, 'index.html', get_home_context())
 
 
 def announcement_detail_view(request, pk):
@@ -42,86 +42,134 @@ class CoursesView(LoginRequiredMixin, TemplateView):
         return context
 
 
+def _course_detail_queryset(user):
+    """
+    Kurs sahifasi uchun queryset: modullar, foydalanuvchi progressi, sertifikat
+    va oxirgi test natijasi modullar sonidan qat'i nazar o'zgarmas miqdordagi
+    so'rovlar bilan olinadi
+    """
+    from django.db.models import Prefetch
+    from .models import Certificate, Module
+    
+    return Course.objects.prefetch_related(
+        Prefetch(
+            'modules',
+            queryset=Module.objects.order_by('number').prefetch_related(
+                Prefetch('user_progress', queryset=UserModuleProgress.objects.filter(user=user),
+                         to_attr='user_progress_list')
+            ),
+            to_attr='ordered_modules'
+        ),
+        Prefetch('user_progress', queryset=UserCourseProgress.objects.filter(user=user),
+                 to_attr='user_course_progress'),
+        Prefetch('certificates', queryset=Certificate.objects.filter(user=user)[:1],
+                 to_attr='user_certificates'),
+        Prefetch('test_results', queryset=UserTestResult.objects.filter(user=user).order_by('-submitted_at')[:1],
+                 to_attr='user_last_tests'),
+    )
+
+
+def _modules_with_status(course):
+    """Har bir modulga is_unlocked, is_completed va progress belgilash"""
+    modules_with_status = []
+    previous_completed = True
+    
+    for module in course.ordered_modules:
+        progress = module.user_progress_list[0] if module.user_progress_list else None
+        is_completed = progress.is_completed if progress else False
+        is_unlocked = previous_completed  # Unlock if previous module was completed
+        
+        module.is_unlocked = is_unlocked
+        module.is_completed = is_completed
+        module.progress = progress
+        modules_with_status.append(module)
+        
+        previous_completed = is_completed
+    
+    return modules_with_status
+
+
+def _course_test_context(course, course_progress, modules_with_status):
+    """partials/course_test_section.html uchun kontekst"""
+    from django.utils import timezone
+    
+    certificate = course.user_certificates[0] if course.user_certificates else None
+    last_test = course.user_last_tests[0] if course.user_last_tests else None
+    
+    # Calculate remaining wait time (8 minutes = 480 seconds)
+    can_retry = True
+    wait_seconds = 0
+    if last_test and not last_test.passed:
+        time_since_test = (timezone.now() - last_test.submitted_at).total_seconds()
+        if time_since_test < 480:  # 8 minutes
+            can_retry = False
+            wait_seconds = int(480 - time_since_test)
+    
+    return {
+        'course': course,
+        'course_progress': course_progress,
+        'all_modules_completed': all(m.is_completed for m in modules_with_status),
+        'test_passed': course_progress.test_passed,
+        'certificate': certificate,
+        'last_test': last_test,
+        'can_retry': can_retry,
+        'wait_seconds': wait_seconds,
+    }
+
+
 class CourseDetailView(LoginRequiredMixin, TemplateView):
     template_name = 'course_detail.html'
     login_url = 'main:login'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        course_id = self.kwargs.get('pk')
-        course = get_object_or_404(Course, pk=course_id, is_active=True)
         user = self.request.user
+        course = get_object_or_404(_course_detail_queryset(user), pk=self.kwargs.get('pk'), is_active=True)
         
-        # Get or create course progress
-        course_progress, created = UserCourseProgress.objects.get_or_create(
-            user=user,
-            course=course
-        )
-        
-        # Set started_at if first time accessing
-        if created or not course_progress.started_at:
-            from django.utils import timezone
-            course_progress.started_at = timezone.now()
-            course_progress.save()
-        
-        # Get all modules
-        modules = course.modules.all().order_by('number')
-        
-        # Get user's module progress
-        user_module_progress = {}
-        for progress in UserModuleProgress.objects.filter(user=user, module__course=course):
-            user_module_progress[progress.module.id] = progress
-        
-        # Determine unlock status for each module
-        modules_with_status = []
-        previous_completed = True
-        
-        for module in modules:
-            progress = user_module_progress.get(module.id)
-            is_completed = progress.is_completed if progress else False
-            is_unlocked = previous_completed  # Unlock if previous module was completed
-            
-            module.is_unlocked = is_unlocked
-            module.is_completed = is_completed
-            module.progress = progress
-            modules_with_status.append(module)
-            
-            previous_completed = is_completed
-        
-        # Check if all modules are completed
-        all_completed = all(m.is_completed for m in modules_with_status)
+        # Birinchi kirishda progress hisoblagichlari bilan yaratiladi
+        if course.user_course_progress:
+            course_progress = course.user_course_progress[0]
+        else:
+            course_progress = get_course_progress(user, course)
         
-        # Get certificate if exists
-        from .models import Certificate
-        certificate = Certificate.objects.filter(user=user, course=course).first()
+        modules_with_status = _modules_with_status(course)
         
-        # Get last test result for retry timer
-        from .models import UserTestResult
-        from django.utils import timezone
-        last_test = UserTestResult.objects.filter(user=user, course=course).order_by('-submitted_at').first()
-        
-        # Calculate remaining wait time (8 minutes = 480 seconds)
-        can_retry = True
-        wait_seconds = 0
-        if last_test and not last_test.passed:
-            time_since_test = (timezone.now() - last_test.submitted_at).total_seconds()
-            if time_since_test < 480:  # 8 minutes
-                can_retry = False
-                wait_seconds = int(480 - time_since_test)
-        
-        context['course'] = course
         context['modules'] = modules_with_status
-        context['course_progress'] = course_progress
-        context['all_modules_completed'] = all_completed
-        context['test_passed'] = course_progress.test_passed
-        context['certificate'] = certificate
-        context['last_test'] = last_test
-        context['can_retry'] = can_retry
-        context['wait_seconds'] = wait_seconds
-        
+        context.update(_course_test_context(course, course_progress, modules_with_status))
         return context
 
 
+def _module_fragments(request, module_ids):
+    """
+    Tugatilgan modullar, ular ochgan keyingi modullar va (barcha modullar
+    tugagan bo'lsa) test bo'limi uchun HTML bo'laklar - sahifani qayta
+    yuklamasdan DOM ni yangilash uchun. Returns: {element_id: html}
+    """
+    from django.template.loader import render_to_string
+    from .models import Module
+    
+    module_ids = set(module_ids)
+    course_ids = Module.objects.filter(pk__in=module_ids).values_list('course_id', flat=True)
+    fragments = {}
+    
+    for course in _course_detail_queryset(request.user).filter(pk__in=course_ids, is_active=True):
+        modules = _modules_with_status(course)
+        for i, module in enumerate(modules):
+            if module.pk in module_ids or (i > 0 and modules[i - 1].pk in module_ids):
+                fragments[f'module-{module.pk}'] = render_to_string(
+                    'partials/course_module.html', {'module': module}, request
+                )
+        
+        if course.user_course_progress:
+            test_context = _course_test_context(course, course.user_course_progress[0], modules)
+            if test_context['all_modules_completed']:
+                fragments['course-test-section'] = render_to_string(
+                    'partials/course_test_section.html', test_context, request
+                )
+    
+    return fragments
+
+
 # Module tracking and completion
 @login_required
 def track_presentation(request, module_id):
@@ -130,12 +178,7 @@ def track_presentation(request, module_id):
     
     if request.method == 'POST':
         module = get_object_or_404(Module, pk=module_id)
-        progress, created = UserModuleProgress.objects.get_or_create(
-            user=request.user,
-            module=module
-        )
-        progress.viewed_presentation = True
-        progress.save()
+        apply_module_events(request.user, [(module.pk, 'presentation')])
         
         return JsonResponse({'status': 'success', 'viewed_presentation': True})
     return JsonResponse({'status': 'error'}, status=400)
@@ -147,12 +190,7 @@ def track_video(request, module_id):
     
     if request.method == 'POST':
         module = get_object_or_404(Module, pk=module_id)
-        progress, created = UserModuleProgress.objects.get_or_create(
-            user=request.user,
-            module=module
-        )
-        progress.watched_video = True
-        progress.save()
+        apply_module_events(request.user, [(module.pk, 'video')])
         
         return JsonResponse({'status': 'success', 'watched_video': True})
     return JsonResponse({'status': 'error'}, status=400)
@@ -160,29 +198,69 @@ def track_video(request, module_id):
 @login_required
 def complete_module(request, module_id):
     from django.http import JsonResponse
-    from django.utils import timezone
     from .models import Module
     
     if request.method == 'POST':
         module = get_object_or_404(Module, pk=module_id)
-        progress, created = UserModuleProgress.objects.get_or_create(
-            user=request.user,
-            module=module
-        )
         
-        # Mark module as completed
-        progress.is_completed = True
-        progress.completed_at = timezone.now()
-        progress.save()
+        # Mark module as completed (kurs hisoblagichi ham shu yerda yangilanadi)
+        apply_module_events(request.user, [(module.pk, 'complete')])
         
         return JsonResponse({
             'status': 'success',
             'is_completed': True,
-            'message': 'Modul muvaffaqiyatli tugatildi!'
+            'message': 'Modul muvaffaqiyatli tugatildi!',
+            'fragments': _module_fragments(request, [module.pk]),
         })
     return JsonResponse({'status': 'error'}, status=400)
 
+@login_required
+def track_module_events(request):
+    """
+    Modul hodisalarini to'plam holida qabul qilish.
+    
+    Body: {"events": [{"module_id": 1, "type": "video" | "presentation" | "complete"}, ...]}
+    """
+    import json
+    from django.http import JsonResponse
+    from .course_progress import MODULE_EVENT_TYPES, MAX_MODULE_EVENTS
+    
+    if request.method != 'POST':
+        return JsonResponse({'status': 'error'}, status=405)
+    
+    try:
+        events = json.loads(request.body).get('events')
+        events = [(int(e['module_id']), str(e['type'])) for e in events]
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({'status': 'error', 'message': 'Noto\'g\'ri so\'rov'}, status=400)
+    
+    if not events or len(events) > MAX_MODULE_EVENTS or any(t not in MODULE_EVENT_TYPES for _, t in events):
+        return JsonResponse({'status': 'error', 'message': 'Noto\'g\'ri hodisalar'}, status=400)
+    
+    modules = apply_module_events(request.user, events)
+    response = {'status': 'success', 'modules': list(modules.values())}
+    
+    # Modul tugatilganda sahifa qayta yuklanmaydi - o'zgargan qismlar qaytariladi
+    completed = [module_id for module_id, event_type in events if event_type == 'complete' and module_id in modules]
+    if completed:
+        response['fragments'] = _module_fragments(request, completed)
+    return JsonResponse(response)
+
+
+@login_required
+def course_test_section(request, pk):
+    """Kutish vaqti tugaganda test bo'limini yangilash uchun HTML bo'lak"""
+    from django.http import JsonResponse
+    from django.template.loader import render_to_string
+    
+    course = get_object_or_404(_course_detail_queryset(request.user), pk=pk, is_active=True)
+    course_progress = course.user_course_progress[0] if course.user_course_progress else get_course_progress(request.user, course)
+    context = _course_test_context(course, course_progress, _modules_with_status(course))
+    return JsonResponse({'html': render_to_string('partials/course_test_section.html', context, request)})
+
 # Course Test Views
+TEST_ATTEMPT_GRACE_SECONDS = 60  # Auto-submit and network delay allowance
+
 @login_required
 def course_test_view(request, course_id):
     from .models import Module, Question, Answer
@@ -191,24 +269,13 @@ def course_test_view(request, course_id):
     user = request.user
     
     # Check if all modules are completed
-    total_modules = course.modules.count()
-    completed_modules = UserModuleProgress.objects.filter(
-        user=user,
-        module__course=course,
-        is_completed=True
-    ).count()
+    course_progress = get_course_progress(user, course)
     
-    print(f"DEBUG: Total modules: {total_modules}, Completed: {completed_modules}")
-    
-    if completed_modules < total_modules:
+    if not course_progress.all_modules_completed:
         print(f"DEBUG: REDIRECT - Modules not completed")
-        messages.error(request, f'Barcha modullarni tugatishingiz kerak! Tugatilgan: {completed_modules}/{total_modules}')
+        messages.error(request, f'Barcha modullarni tugatishingiz kerak! Tugatilgan: {course_progress.completed_modules}/{course_progress.total_modules}')
         return redirect('main:course_detail', pk=course_id)
     
-    # Check if test already passed - allow retrying even if passed
-    course_progress = UserCourseProgress.objects.filter(user=user, course=course).first()
-    print(f"DEBUG: Course progress exists: {course_progress is not None}, Test passed: {course_progress.test_passed if course_progress else 'N/A'}")
-    
     # Check if user needs to wait 8 minutes after failed attempt
     last_test = UserTestResult.objects.filter(user=user, course=course, passed=False).order_by('-submitted_at').first()
     if last_test:
@@ -224,25 +291,36 @@ def course_test_view(request, course_id):
     # Allow retrying test even if passed (removed the block that prevented retrying)
     
     # Get all questions for this course
-    if not course.test_set:
+    if not course.test_set_id:
         print(f"DEBUG: REDIRECT - No test set assigned")
         messages.error(request, 'Ushbu kurs uchun test biriktirilmagan!')
         return redirect('main:course_detail', pk=course_id)
     
-    questions = Question.objects.filter(test_set=course.test_set).prefetch_related('answers').order_by('?')[:20]  # Random 20 questions
-    print(f"DEBUG: Questions count: {questions.count()}")
-    
-    if not questions.exists():
+    # Random 20 questions, sampled from the cached id list (a plain list, safe to reuse)
+    questions = sample_questions(course.test_set_id, 20)
+
+    if not questions:
         print(f"DEBUG: REDIRECT - No questions available")
         messages.error(request, 'Test savollari hozircha yuklanmagan!')
         return redirect('main:course_detail', pk=course_id)
     
     print(f"DEBUG: SUCCESS - Rendering test page")
     # Calculate total time (time_per_question * total_questions)
-    total_time_minutes = course.time_per_question * questions.count()
+    total_time_minutes = course.time_per_question * len(questions)
+    
+    # Record exactly which questions were served and until when
+    from django.utils import timezone
+    from datetime import timedelta
+    attempt = TestAttempt.objects.create(
+        user=user,
+        course=course,
+        question_ids=[question.id for question in questions],
+        deadline=timezone.now() + timedelta(minutes=total_time_minutes, seconds=TEST_ATTEMPT_GRACE_SECONDS),
+    )
     
     context = {
         'course': course,
+        'attempt': attempt,
         'questions': questions,
         'total_time_minutes': total_time_minutes,
         'total_time_seconds': total_time_minutes * 60,
@@ -266,20 +344,26 @@ def submit_test(request, course_id):
         data = json.loads(request.body)
         answers = data.get('answers', {})
         
-        # Get all questions
-        questions = Question.objects.filter(test_set=course.test_set).prefetch_related('answers')
-        total_questions = questions.count()
-        correct_answers = 0
+        # Only the questions served in this attempt are graded
+        attempt_id = str(data.get('attempt_id', ''))
+        attempt = None
+        if attempt_id.isdigit():
+            attempt = TestAttempt.objects.filter(pk=attempt_id, user=user, course=course).first()
+        if not attempt:
+            return JsonResponse({'error': 'Test urinishi topilmadi'}, status=400)
         
-        # Check answers
-        for question in questions:
-            question_id = str(question.id)
-            user_answer_id = answers.get(question_id)
-            
-            if user_answer_id:
-                correct_answer = question.answers.filter(is_correct=True).first()
-                if correct_answer and str(correct_answer.id) == str(user_answer_id):
-                    correct_answers += 1
+        now = timezone.now()
+        if now > attempt.deadline:
+            return JsonResponse({'error': 'Test topshirish vaqti tugagan'}, status=400)
+        
+        # Mark the attempt as submitted; a duplicate submission updates nothing
+        claimed = TestAttempt.objects.filter(pk=attempt.pk, submitted_at__isnull=True).update(submitted_at=now)
+        if not claimed:
+            return JsonResponse({'error': 'Bu test allaqachon topshirilgan'}, status=400)
+        
+        # Check answers against the cached answer key
+        answer_key = get_answer_key(course.test_set_id)
+        correct_answers, total_questions = grade_answers(answer_key, answers, attempt.question_ids)
         
         # Calculate percentage
         percentage = int((correct_answers / total_questions) * 100) if total_questions > 0 else 0
@@ -297,45 +381,21 @@ def submit_test(request, course_id):
         )
         
         # Update course progress
-        course_progress, created = UserCourseProgress.objects.get_or_create(
-            user=user,
-            course=course
-        )
+        course_progress = get_course_progress(user, course)
         course_progress.test_score = percentage
         course_progress.test_passed = passed
         
+        certificate_status = None
         if passed:
             course_progress.is_completed = True
             course_progress.completed_at = timezone.now()
             
-            # Generate certificate automatically (only once per course)
-            try:
-                from main.certificate_generator import generate_certificate
-                from main.models import Certificate
-                from django.core.files.base import ContentFile
-                
-                # Check if certificate already exists for this user and course
-                existing_certificate = Certificate.objects.filter(
-                    user=user,
-                    course=course
-                ).first()
-                
-                if not existing_certificate:
-                    # Create new certificate only if doesn't exist
-                    pdf_buffer = generate_certificate(user, course, test_result)
-                    certificate = Certificate.objects.create(
-                        user=user,
-                        course=course,
-                        test_result=test_result
-                    )
-                    certificate.certificate_file.save(
-                        f'certificate_{user.id}_{course.id}_{timezone.now().strftime("%Y%m%d")}.pdf',
-                        ContentFile(pdf_buffer.getvalue())
-                    )
-            except Exception as cert_error:
-                print(f"Certificate generation error: {cert_error}")
-        
-        course_progress.save()
+            # Certificate is rendered by the process_certificates worker (only once per course)
+            from main.certificate_queue import enqueue_certificate
+            certificate_status = enqueue_certificate(user, course, test_result)
+        
+        # Modul hisoblagichlari bu yerda qayta yozilmasligi kerak
+        course_progress.save(update_fields=['test_score', 'test_passed', 'is_completed', 'completed_at'])
         
         return JsonResponse({
             'success': True,
@@ -343,7 +403,8 @@ def submit_test(request, course_id):
             'percentage': percentage,
             'correct_answers': correct_answers,
             'total_questions': total_questions,
-            'passing_score': course.passing_score
+            'passing_score': course.passing_score,
+            'certificate_status': certificate_status,
         })
         
     except Exception as e:
@@ -376,108 +437,126 @@ class IqtidorliBazaView(LoginRequiredMixin, TemplateView):
 
 
 # Stipendiyalar
-class DavlatStipendiyalariView(TemplateView):
+class DavlatStipendiyalariView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'davlat_stipendiyalari.html'
+    cache_models = ('StateScholarship',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['scholarships'] = StateScholarship.objects.all().order_by('-created_at')
+        context['page_obj'] = context['scholarships'] = self.paginate_queryset(
+            StateScholarship.objects.all(), ('-created_at', '-id')
+        )
         return context
 
 
-class BuxDUStipendiyalariView(TemplateView):
+class BuxDUStipendiyalariView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'buxdu_stipendiyalari.html'
+    cache_models = ('BuxduScholarship',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['scholarships'] = BuxduScholarship.objects.all().order_by('-created_at')
+        context['page_obj'] = context['scholarships'] = self.paginate_queryset(
+            BuxduScholarship.objects.all(), ('-created_at', '-id')
+        )
         return context
 
 
-class BuxDUStipendiyaBazasiView(TemplateView):
+class BuxDUStipendiyaBazasiView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'buxdu_stipendiya_bazasi.html'
+    cache_models = ('BuxduWinnerDatabase',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['databases'] = BuxduWinnerDatabase.objects.all().order_by('-academic_year')
+        context['page_obj'] = context['databases'] = self.paginate_queryset(
+            BuxduWinnerDatabase.objects.all(), ('-academic_year', '-id')
+        )
         return context
 
 
 # Olimpiadalar
-class OlimpiadalarView(TemplateView):
+class OlimpiadalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'olimpiadalar.html'
+    cache_models = ('Olympiad',)
+    cache_vary_on_date = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from datetime import date
         # Faqat kelgusi olimpiadalarni ko'rsatish
-        olympiads = Olympiad.objects.filter(date__gte=date.today()).order_by('date')
-        context['olympiads'] = olympiads
+        context['page_obj'] = context['olympiads'] = self.paginate_queryset(
+            Olympiad.objects.upcoming(), ('date', 'id')
+        )
         return context
 
 
-class XalqaroOlimpiadalarView(TemplateView):
+class XalqaroOlimpiadalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'olimpiadalar_dynamic.html'
+    cache_models = ('Olympiad',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['olympiads'] = Olympiad.objects.filter(type='international').order_by('-created_at')
+        context['page_obj'] = context['olympiads'] = self.paginate_queryset(
+            Olympiad.objects.filter(type='international'), ('-created_at', '-id')
+        )
         context['olimp_type'] = 'xalqaro'
         context['hero_image'] = 'assets/xalqaro_olymp.jpg'
         return context
 
 
-class RespublikaOlimpiadalarView(TemplateView):
+class RespublikaOlimpiadalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'olimpiadalar_dynamic.html'
+    cache_models = ('Olympiad',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['olympiads'] = Olympiad.objects.filter(type='republic').order_by('-created_at')
+        context['page_obj'] = context['olympiads'] = self.paginate_queryset(
+            Olympiad.objects.filter(type='republic'), ('-created_at', '-id')
+        )
         context['olimp_type'] = 'respublika'
         context['hero_image'] = 'assets/olimpiada.jpg'
         return context
 
 
-class OnlaynOlimpiadalarView(TemplateView):
+class OnlaynOlimpiadalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'olimpiadalar_dynamic.html'
+    cache_models = ('Olympiad',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['olympiads'] = Olympiad.objects.filter(type='online').order_by('-created_at')
+        context['page_obj'] = context['olympiads'] = self.paginate_queryset(
+            Olympiad.objects.filter(type='online'), ('-created_at', '-id')
+        )
         context['olimp_type'] = 'onlayn'
         context['hero_image'] = 'assets/onlayn_olymp.jpg'
         return context
 
 
-class BuxDUOlimpiadaGoliblarView(TemplateView):
+class BuxDUOlimpiadaGoliblarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'buxdu_olimpiada_goliblari.html'
+    cache_models = ('BuxduOlympiadWinner',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['winners'] = BuxduOlympiadWinner.objects.all().order_by('-created_at')
+        context['page_obj'] = context['winners'] = self.paginate_queryset(
+            BuxduOlympiadWinner.objects.all(), ('-created_at', '-id')
+        )
         return context
 
 
-class BuxDUOlimpiadalarView(TemplateView):
+class BuxDUOlimpiadalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'buxdu_olimpiadalari.html'
+    cache_models = ('BuxduOlympiad',)
+    cache_vary_on_date = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        from django.utils import timezone
-        
-        today = timezone.now().date()
-        all_olympiads = BuxduOlympiad.objects.all()
-        
-        # Kutilayotgan va tugagan olimpiadalarni ajratish
-        upcoming = [o for o in all_olympiads if o.date >= today]
-        finished = [o for o in all_olympiads if o.date < today]
-        
-        # Sanaga ko'ra tartiblash
-        upcoming.sort(key=lambda x: x.date)
-        finished.sort(key=lambda x: x.date, reverse=True)
-        
-        context['upcoming_olympiads'] = upcoming
-        context['finished_olympiads'] = finished
+        # Kutilayotgan va tugagan olimpiadalar - date bo'yicha alohida oraliq so'rovlari,
+        # har biri o'z cursor i bilan sahifalanadi
+        upcoming = BuxduOlympiad.objects.upcoming()
+        context['upcoming_olympiads'] = self.paginate_queryset(upcoming, ('date', 'id'), prefix='upcoming_')
+        context['upcoming_count'] = upcoming.count
+        context['finished_olympiads'] = self.paginate_queryset(
+            BuxduOlympiad.objects.finished(), ('-date', '-id'), prefix='finished_'
+        )
         return context
 
 
@@ -487,68 +566,86 @@ class BuxDUOlimpiadaDetailView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         olympiad_id = self.kwargs.get('pk')
-        olympiad = get_object_or_404(BuxduOlympiad, pk=olympiad_id)
+        olympiad = get_object_or_404(BuxduOlympiad.objects.with_status(), pk=olympiad_id)
         context['olympiad'] = olympiad
         context['gallery_images'] = olympiad.images.all()
         return context
 
 
 # Ilmiy nashrlar
-class MahalliyOAKJurnallariView(TemplateView):
+class MahalliyOAKJurnallariView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'oak_jurnallari_dynamic.html'
+    cache_models = ('OakDatabase',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['journals'] = OakDatabase.objects.filter(type='local').order_by('-created_at')
+        context['page_obj'] = context['journals'] = self.paginate_queryset(
+            OakDatabase.objects.filter(type='local'), ('-created_at', '-id')
+        )
         context['oak_type'] = 'mahalliy'
         return context
 
 
-class XalqaroOAKJurnallariView(TemplateView):
+class XalqaroOAKJurnallariView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'oak_jurnallari_dynamic.html'
+    cache_models = ('OakDatabase',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['journals'] = OakDatabase.objects.filter(type='international').order_by('-created_at')
+        context['page_obj'] = context['journals'] = self.paginate_queryset(
+            OakDatabase.objects.filter(type='international'), ('-created_at', '-id')
+        )
         context['oak_type'] = 'xalqaro'
         return context
 
 
-class XalqaroKonferensiyalarView(TemplateView):
+class XalqaroKonferensiyalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'konferensiyalar_dynamic.html'
+    cache_models = ('Conference',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['conferences'] = Conference.objects.filter(type='international').order_by('-created_at')
+        context['page_obj'] = context['conferences'] = self.paginate_queryset(
+            Conference.objects.filter(type='international'), ('-created_at', '-id')
+        )
         context['konf_type'] = 'xalqaro'
         return context
 
 
-class RespublikaKonferensiyalarView(TemplateView):
+class RespublikaKonferensiyalarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'konferensiyalar_dynamic.html'
+    cache_models = ('Conference',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['conferences'] = Conference.objects.filter(type='republic').order_by('-created_at')
+        context['page_obj'] = context['conferences'] = self.paginate_queryset(
+            Conference.objects.filter(type='republic'), ('-created_at', '-id')
+        )
         context['konf_type'] = 'respublika'
         return context
 
 
-class DissertatsiyalarBankiView(TemplateView):
+class DissertatsiyalarBankiView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'dissertatsiyalar_banki.html'
+    cache_models = ('DissertationBank',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['dissertations'] = DissertationBank.objects.all().order_by('-created_at')
+        context['page_obj'] = context['dissertations'] = self.paginate_queryset(
+            DissertationBank.objects.all(), ('-created_at', '-id')
+        )
         return context
 
 
-class MaqolalarBankiView(TemplateView):
+class MaqolalarBankiView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'maqolalar_banki.html'
+    cache_models = ('ArticleBank',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['articles'] = ArticleBank.objects.all().order_by('-created_at')
+        context['page_obj'] = context['articles'] = self.paginate_queryset(
+            ArticleBank.objects.all(), ('-created_at', '-id')
+        )
         return context
 
 
@@ -561,12 +658,15 @@ class MaqolaJurnalTavsiyasiView(TemplateView):
     template_name = 'maqola_jurnal_tavsiyasi.html'
 
 
-class IlmiyNizomlarView(TemplateView):
+class IlmiyNizomlarView(KeysetPaginationMixin, CatalogCacheMixin, TemplateView):
     template_name = 'ilmiy_nizomlar.html'
+    cache_models = ('ResearcherRegulation',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['regulations'] = ResearcherRegulation.objects.all().order_by('-created_at')
+        context['page_obj'] = context['regulations'] = self.paginate_queryset(
+            ResearcherRegulation.objects.all(), ('-created_at', '-id')
+        )
         return context
 
 
@@ -628,33 +728,21 @@ def logout_view(request):
 
 @login_required
 def profile_view(request):
-    # Get user's course progress
+    # Get user's course progress (foizlar saqlangan hisoblagichlardan olinadi)
     user_courses = UserCourseProgress.objects.filter(
         user=request.user
     ).select_related('course').order_by('-started_at')
     
-    # Calculate progress for each course
-    courses_data = []
-    for progress in user_courses:
-        course = progress.course
-        total_modules = course.modules.count()
-        completed_modules = UserModuleProgress.objects.filter(
-            user=request.user,
-            module__course=course,
-            is_completed=True
-        ).count()
-        
-        progress_percentage = 0
-        if total_modules > 0:
-            progress_percentage = int((completed_modules / total_modules) * 100)
-        
-        courses_data.append({
+    courses_data = [
+        {
             'progress': progress,
-            'course': course,
-            'total_modules': total_modules,
-            'completed_modules': completed_modules,
-            'progress_percentage': progress_percentage,
-        })
+            'course': progress.course,
+            'total_modules': progress.total_modules,
+            'completed_modules': progress.completed_modules,
+            'progress_percentage': progress.progress_percentage,
+        }
+        for progress in user_courses
+    ]
     
     # Get user's certificates
     from main.models import Certificate
@@ -662,6 +750,13 @@ def profile_view(request):
         user=request.user
     ).select_related('course', 'test_result').order_by('-issued_at')
     
+    # Certificates still being prepared by the worker
+    from main.models import CertificateJob
+    certificate_jobs = CertificateJob.objects.filter(
+        user=request.user,
+        status__in=['pending', 'processing', 'failed']
+    ).select_related('course').order_by('-created_at')
+    
     # Get assessment test results
     assessment_results = AssessmentTestResult.objects.filter(
         user=request.user
@@ -686,6 +781,9 @@ def profile_view(request):
         'user': request.user,
         'courses_data': courses_data,
         'certificates': certificates,
+        'certificate_jobs': certificate_jobs,
+        # Faqat navbatdagi vazifalar bo'lsa so'rab turiladi (xato bilan tugaganlar kutilmaydi)
+        'certificate_jobs_active': any(job.status != 'failed' for job in certificate_jobs),
         'assessment_results': assessment_results,
         'can_take_assessment': can_take_assessment,
         'assessment_wait_time': assessment_wait_time,
@@ -696,24 +794,114 @@ def profile_view(request):
 @login_required
 def download_certificate(request, certificate_id):
     """Download certificate as PDF with FIO filename"""
-    from django.http import FileResponse, Http404
     from .models import Certificate
+    from .media_delivery import serve_protected_file
     
-    certificate = get_object_or_404(Certificate, id=certificate_id, user=request.user)
-    
-    if not certificate.certificate_file:
-        raise Http404("Certificate file not found")
+    # Xodimlar (admin panel) istalgan sertifikatni, qolganlar faqat o'zinikini yuklaydi
+    certificates = Certificate.objects.select_related('user')
+    if not request.user.is_staff:
+        certificates = certificates.filter(user=request.user)
+    certificate = get_object_or_404(certificates, id=certificate_id)
     
     # Create filename with user's FIO (Full Name)
-    user = request.user
+    user = certificate.user
     fio = f"{user.last_name}_{user.first_name}".replace(' ', '_')
     filename = f"Sertifikat_{fio}.pdf"
     
-    response = FileResponse(certificate.certificate_file.open('rb'), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return serve_protected_file(request, certificate.certificate_file, filename=filename,
+                                as_attachment=True, content_type='application/pdf')
+
+
+@login_required
+def download_presentation(request, module_id):
+    """Modul taqdimotini faqat tizimga kirgan foydalanuvchilarga berish"""
+    from .models import Module
+    from .media_delivery import serve_protected_file
+    
+    module = get_object_or_404(Module, pk=module_id, course__is_active=True)
+    return serve_protected_file(request, module.presentation, as_attachment=True)
+
+
+@login_required
+def download_talented_database(request, pk):
+    """Iqtidorli talabalar bazasi faylini berish"""
+    from .media_delivery import serve_protected_file
+    
+    database = get_object_or_404(TalentedStudentDatabase, pk=pk)
+    return serve_protected_file(request, database.file, as_attachment=True)
+
+
+@login_required
+def certificate_status(request):
+    """Tayyorlanayotgan sertifikatlar holati (profil sahifasi so'rab turadi)"""
+    from django.http import JsonResponse
+    from .models import CertificateJob
+    
+    jobs = CertificateJob.objects.filter(
+        user=request.user,
+        status__in=['pending', 'processing', 'failed']
+    ).select_related('course')
+    
+    pending = sum(1 for job in jobs if job.status != 'failed')
+    response = {
+        'pending': pending,
+        'jobs': [
+            {'course_id': job.course_id, 'course_name': job.course.name, 'status': job.status}
+            for job in jobs
+        ],
+    }
+    
+    # Navbat bo'shaganda profil sahifasi qayta yuklanmaydi - sertifikatlar bo'limi qaytariladi
+    if not pending:
+        from django.template.loader import render_to_string
+        from .models import Certificate
+        
+        certificates = Certificate.objects.filter(
+            user=request.user
+        ).select_related('course', 'test_result').order_by('-issued_at')
+        response['certificate_count'] = len(certificates)
+        response['html'] = render_to_string('partials/profile_certificates.html', {
+            'certificates': certificates,
+            'certificate_jobs': jobs,
+        }, request)
+    
+    return JsonResponse(response)
+
+
+def university_search(request):
+    """OTM nomlari bo'yicha typeahead (ro'yxatdan o'tish va sozlamalar sahifalari uchun)"""
+    from django.http import JsonResponse
+    from django.utils.cache import patch_cache_control
+    from .universities import get_university_index, OTHER_CHOICE
+    
+    query = request.GET.get('q', '')[:100]
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    
+    results = get_university_index().search(query, limit=limit)
+    if query and len(results) < limit and OTHER_CHOICE[0].casefold().startswith(query.strip().casefold()):
+        results.append(OTHER_CHOICE[0])
+    
+    response = JsonResponse({'results': results})
+    patch_cache_control(response, public=True, max_age=300)
     return response
 
 
+def search_view(request):
+    """Katalog bo'yicha qidiruv sahifasi; ?format=json bilan natijalar JSON da qaytariladi"""
+    from django.http import JsonResponse
+    from .search import search_catalog
+    
+    query = request.GET.get('q', '').strip()
+    results = search_catalog(query) if query else []
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'query': query, 'results': results})
+    return render(request, 'qidiruv.html', {'query': query, 'results': results})
+
+
 @login_required
 def settings_view(request):
     if request.method == 'POST':
@@ -853,22 +1041,10 @@ def submit_assessment_test(request):
         if not assessment_test or not assessment_test.test_set:
             return JsonResponse({'success': False, 'error': 'Test topilmadi'}, status=404)
         
-        # Savollar va javoblarni olish
-        questions = Question.objects.filter(test_set=assessment_test.test_set).prefetch_related('answers')
-        total_questions = questions.count()
-        correct_answers = 0
-        
-        # Javoblarni tekshirish
-        for question in questions:
-            question_id = str(question.id)
-            user_answer_id = answers.get(question_id)
-            
-            if user_answer_id:
-                # Foydalanuvchi javob bergan
-                correct_answer = question.answers.filter(is_correct=True).first()
-                if correct_answer and str(correct_answer.id) == str(user_answer_id):
-                    correct_answers += 1
-            # Agar javob bermagan bo'lsa, xato deb hisoblanadi (correct_answers o'zgarmaydi)
+        # Javoblarni keshdagi kalit bo'yicha tekshirish
+        # (javob berilmagan savol xato deb hisoblanadi)
+        answer_key = get_answer_key(assessment_test.test_set_id)
+        correct_answers, total_questions = grade_answers(answer_key, answers)
         
         # Foizni hisoblash
         percentage = (correct_answers / total_questions * 100) if total_questions > 0 else 0
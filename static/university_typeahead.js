@@ -0,0 +1,46 @@
+// OTM maydoni uchun typeahead: variantlar serverdagi indeksdan <datalist> ga yuklanadi
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-university-search]').forEach(function(input) {
+        const url = input.dataset.universitySearch;
+        const datalist = document.createElement('datalist');
+        datalist.id = input.id + '_options';
+        input.setAttribute('list', datalist.id);
+        input.after(datalist);
+
+        let timer = null;
+        let controller = null;
+        const results = {};
+
+        function render(names) {
+            datalist.replaceChildren(...names.map(function(name) {
+                const option = document.createElement('option');
+                option.value = name;
+                return option;
+            }));
+        }
+
+        input.addEventListener('input', function() {
+            const query = input.value.trim();
+            clearTimeout(timer);
+            if (query.length < 2) {
+                render([]);
+                return;
+            }
+            if (results[query]) {
+                render(results[query]);
+                return;
+            }
+            timer = setTimeout(function() {
+                if (controller) controller.abort();
+                controller = new AbortController();
+                fetch(url + '?q=' + encodeURIComponent(query), { signal: controller.signal })
+                    .then(function(response) { return response.json(); })
+                    .then(function(data) {
+                        results[query] = data.results;
+                        if (input.value.trim() === query) render(data.results);
+                    })
+                    .catch(function() {});
+            }, 150);
+        });
+    });
+});
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'main',
 ]
 
@@ -94,6 +95,34 @@ DATABASES = {
 
 
 
+# Cache
+# CACHE_URL bo'sh bo'lsa - locmem (development). Production uchun jarayonlar
+# o'rtasida umumiy cache kerak: redis://host:6379/1 yoki file:///var/tmp/yosh_cache
+CACHE_URL = os.environ.get('CACHE_URL', '')
+
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('file://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL[len('file://'):],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'yosh-tadqiqotchi',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -157,6 +186,17 @@ SESSION_SAVE_EVERY_REQUEST = False  # Har safar request bo'lganda session yangil
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Protected media (sertifikatlar, taqdimotlar, iqtidorli talabalar fayllari)
+# Ruxsat Django da tekshiriladi, baytlarni esa veb-server uzatadi:
+#   'nginx'  -> X-Accel-Redirect, masalan:
+#               location /protected-media/ { internal; alias /path/to/media/; }
+#   'apache' -> X-Sendfile (mod_xsendfile)
+#   None     -> Django faylni o'zi beradi (ETag, Last-Modified, Range bilan)
+# Ommaviy /media/ location certificates/, modules/presentations/ va
+# talented_students/ papkalarini bermasligi kerak.
+PROTECTED_MEDIA_SERVER = os.environ.get('PROTECTED_MEDIA_SERVER') or None
+PROTECTED_MEDIA_INTERNAL_URL = '/protected-media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
@@ -189,7 +229,7 @@ JAZZMIN_SETTINGS = {
     "search_model": "main.User",
 
     # Field name on user model that contains avatar ImageField/URLField/Charfield or a callable that receives the user
-    "user_avatar": "profile_image",
+    "user_avatar": "avatar_small",
 
     # Icons that are used when one is not manually specified
     "default_icon_parents": "fas fa-chevron-circle-right",
@@ -223,9 +263,12 @@ JAZZMIN_SETTINGS = {
         "main.UserCourseProgress": "fas fa-chart-line",
         "main.UserModuleProgress": "fas fa-tasks",
         "main.UserTestResult": "fas fa-chart-bar",
+        "main.TestAttempt": "fas fa-hourglass-half",
         "main.Certificate": "fas fa-certificate",
+        "main.CertificateJob": "fas fa-stream",
         "main.AssessmentTest": "fas fa-file-signature",
         "main.AssessmentTestResult": "fas fa-poll-h",
+        "main.University": "fas fa-university",
     },
 
     # Links to put along the top menu